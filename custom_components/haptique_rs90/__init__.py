@@ -4,16 +4,42 @@ from __future__ import annotations
 import logging
 from typing import Any
 
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import device_registry as dr
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_REMOTE_ID,
+    DATA_DEVICE_COORDINATORS,
+    COMMAND_QUEUE_MAX_DEPTH,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
 from .coordinator import HaptiqueRS90Coordinator
+from .websocket_api import async_register_websocket_commands
 
 _LOGGER = logging.getLogger(__name__)
 
+_DELAY_MS = vol.All(vol.Coerce(float), vol.Range(min=0))
+
+SEND_COMMAND_SEQUENCE_SCHEMA = vol.Schema(
+    {
+        vol.Required("rs90_id"): cv.string,
+        vol.Required("rs90_device_id"): cv.string,
+        # A list, or a comma separated string
+        vol.Required("commands"): vol.All(cv.ensure_list_csv, [cv.string], vol.Length(min=1)),
+        # One delay per command, or a single delay for all of them
+        vol.Optional("delays", default=[]): vol.Any(_DELAY_MS, [_DELAY_MS]),
+        vol.Optional("repeat", default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=20)),
+    }
+)
+
 PLATFORMS: list[Platform] = [
     Platform.BUTTON,  # RGB ring light control - First in controls section
     Platform.SENSOR,
@@ -22,6 +48,37 @@ PLATFORMS: list[Platform] = [
 ]
 
 
+@callback
+def async_get_coordinator(hass: HomeAssistant, rs90_id: str) -> HaptiqueRS90Coordinator | None:
+    """Return the coordinator of an RS90 remote from its HA device ID.
+    
+    Resolutions are cached in hass.data so service calls resolve in
+    constant time; the device registry is only walked on a cache miss.
+    """
+    domain_data = hass.data.get(DOMAIN, {})
+    coordinators = domain_data.setdefault(DATA_DEVICE_COORDINATORS, {})
+    if (coordinator := coordinators.get(rs90_id)) is not None:
+        return coordinator
+    
+    # Find the coordinator for this device
+    device_registry = dr.async_get(hass)
+    device_entry = device_registry.async_get(rs90_id)
+    
+    if not device_entry:
+        _LOGGER.error("Device not found: %s", rs90_id)
+        return None
+    
+    # Find the config entry
+    for entry_id in device_entry.config_entries:
+        if entry_id in domain_data:
+            coordinator = domain_data[entry_id]
+            coordinators[rs90_id] = coordinator
+            return coordinator
+    
+    _LOGGER.error("Coordinator not found for device: %s", rs90_id)
+    return None
+
+
 async def async_setup_services(hass: HomeAssistant) -> None:
     """Set up services for Haptique RS90."""
     
@@ -35,37 +92,18 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             _LOGGER.error("rs90_macro_id is required")
             return
         
-        # Find the coordinator for this device
-        device_registry = dr.async_get(hass)
-        device_entry = device_registry.async_get(rs90_id)
-        
-        if not device_entry:
-            _LOGGER.error("Device not found: %s", rs90_id)
+        coordinator = async_get_coordinator(hass, rs90_id)
+        if coordinator is None:
             return
         
-        # Find the config entry
-        for entry_id in device_entry.config_entries:
-            if entry_id in hass.data.get(DOMAIN, {}):
-                coordinator = hass.data[DOMAIN][entry_id]
-                
-                # Resolve rs90_macro_id to macro_name (for MQTT topic)
-                macros = coordinator.data.get("macros", [])
-                macro_name = None
-                for macro in macros:
-                    if macro.get("id") == rs90_macro_id:
-                        macro_name = macro.get("name")
-                        _LOGGER.debug("Resolved rs90_macro_id %s to macro_name: %s", 
-                                    rs90_macro_id, macro_name)
-                        break
-                
-                if not macro_name:
-                    _LOGGER.error("Could not find macro with rs90_macro_id: %s", rs90_macro_id)
-                    return
-                
-                await coordinator.async_trigger_macro(macro_name, action)
-                return
+        # Resolve rs90_macro_id to macro_name (for MQTT topic)
+        macro_name = coordinator.get_macro_name(rs90_macro_id)
+        if not macro_name:
+            _LOGGER.error("Could not find macro with rs90_macro_id: %s", rs90_macro_id)
+            return
+        _LOGGER.debug("Resolved rs90_macro_id %s to macro_name: %s", rs90_macro_id, macro_name)
         
-        _LOGGER.error("Coordinator not found for device: %s", rs90_id)
+        await coordinator.async_trigger_macro(macro_name, action)
     
     async def handle_trigger_device_command(call):
         """Handle the trigger_device_command service call."""
@@ -77,82 +115,81 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             _LOGGER.error("rs90_device_id is required")
             return
         
-        # Find the coordinator for this device
-        device_registry = dr.async_get(hass)
-        device_entry = device_registry.async_get(rs90_id)
+        coordinator = async_get_coordinator(hass, rs90_id)
+        if coordinator is None:
+            return
         
-        if not device_entry:
-            _LOGGER.error("Device not found: %s", rs90_id)
+        # Resolve rs90_device_id to device_name (for MQTT topic)
+        device_name = coordinator.get_device_name(rs90_device_id)
+        if not device_name:
+            _LOGGER.error("Could not find device with rs90_device_id: %s", rs90_device_id)
             return
+        _LOGGER.debug("Resolved rs90_device_id %s to device_name: %s", rs90_device_id, device_name)
+        
+        # Lazy catalog: a device used from a service gets its commands loaded
+        coordinator.async_want_device(device_name)
+        await coordinator.async_trigger_device_command(device_name, command_name)
+    
+    async def handle_send_command_sequence(call: ServiceCall) -> ServiceResponse:
+        """Handle the send_command_sequence service call."""
+        rs90_id = call.data["rs90_id"]
+        rs90_device_id = call.data["rs90_device_id"]
+        commands = call.data["commands"]
+        delays = call.data["delays"]
+        repeat = call.data["repeat"]
+        
+        if not isinstance(delays, list):
+            delays = [delays] * len(commands)
+        
+        # The device queue drops commands beyond its depth: refuse up front
+        # rather than sending a truncated sequence
+        if len(commands) * repeat > COMMAND_QUEUE_MAX_DEPTH:
+            raise HomeAssistantError(
+                f"Command sequence too long: {len(commands)} commands x {repeat} "
+                f"exceeds {COMMAND_QUEUE_MAX_DEPTH}"
+            )
+        
+        # Resolve everything once for the whole sequence
+        coordinator = async_get_coordinator(hass, rs90_id)
+        if coordinator is None:
+            raise HomeAssistantError(f"Coordinator not found for device: {rs90_id}")
+        device_name = coordinator.get_device_name(rs90_device_id)
+        if not device_name:
+            raise HomeAssistantError(f"Could not find device with rs90_device_id: {rs90_device_id}")
         
-        # Find the config entry
-        for entry_id in device_entry.config_entries:
-            if entry_id in hass.data.get(DOMAIN, {}):
-                coordinator = hass.data[DOMAIN][entry_id]
-                
-                # Resolve rs90_device_id to device_name (for MQTT topic)
-                devices = coordinator.data.get("devices", [])
-                device_name = None
-                for device in devices:
-                    if device.get("id") == rs90_device_id:
-                        device_name = device.get("name")
-                        _LOGGER.debug("Resolved rs90_device_id %s to device_name: %s", 
-                                    rs90_device_id, device_name)
-                        break
-                
-                if not device_name:
-                    _LOGGER.error("Could not find device with rs90_device_id: %s", rs90_device_id)
-                    return
-                
-                await coordinator.async_trigger_device_command(device_name, command_name)
-                return
+        # Delays are in ms, one per command (missing ones default to 0)
+        steps = [
+            (command, delays[idx] / 1000 if idx < len(delays) else 0.0)
+            for idx, command in enumerate(commands)
+        ] * repeat
         
-        _LOGGER.error("Coordinator not found for device: %s", rs90_id)
+        coordinator.async_want_device(device_name)
+        result = await coordinator.async_send_command_sequence(device_name, steps)
+        _LOGGER.info("Command sequence sent to %s: %d/%d commands", device_name, result["sent"], len(steps))
+        return result if call.return_response else None
     
     async def handle_refresh_lists(call):
         """Handle the refresh_lists service call."""
         rs90_id = call.data.get("rs90_id")
         
-        # Find the coordinator for this device
-        device_registry = dr.async_get(hass)
-        device_entry = device_registry.async_get(rs90_id)
-        
-        if not device_entry:
-            _LOGGER.error("Device not found: %s", rs90_id)
+        coordinator = async_get_coordinator(hass, rs90_id)
+        if coordinator is None:
             return
         
-        # Find the config entry
-        for entry_id in device_entry.config_entries:
-            if entry_id in hass.data.get(DOMAIN, {}):
-                coordinator = hass.data[DOMAIN][entry_id]
-                await coordinator.async_force_refresh_lists()
-                _LOGGER.info("Force refresh lists requested for device: %s", rs90_id)
-                return
-        
-        _LOGGER.error("Coordinator not found for device: %s", rs90_id)
+        await coordinator.async_force_refresh_lists()
+        _LOGGER.info("Force refresh lists requested for device: %s", rs90_id)
     
     async def handle_trigger_rgb_light(call):
         """Handle the trigger_rgb_light service call."""
         rs90_id = call.data.get("rs90_id")
         duration = call.data.get("duration", 5)  # Default 5 seconds
         
-        # Find the coordinator for this device
-        device_registry = dr.async_get(hass)
-        device_entry = device_registry.async_get(rs90_id)
-        
-        if not device_entry:
-            _LOGGER.error("Device not found: %s", rs90_id)
+        coordinator = async_get_coordinator(hass, rs90_id)
+        if coordinator is None:
             return
         
-        # Find the config entry
-        for entry_id in device_entry.config_entries:
-            if entry_id in hass.data.get(DOMAIN, {}):
-                coordinator = hass.data[DOMAIN][entry_id]
-                await coordinator.async_control_led_light("on", duration=duration)
-                _LOGGER.info("RGB light triggered for device: %s with duration: %d", rs90_id, duration)
-                return
-        
-        _LOGGER.error("Coordinator not found for device: %s", rs90_id)
+        await coordinator.async_control_led_light("on", duration=duration)
+        _LOGGER.info("RGB light triggered for device: %s with duration: %d", rs90_id, duration)
     
     # Register services only once
     if not hass.services.has_service(DOMAIN, "trigger_macro"):
@@ -169,6 +206,15 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             handle_trigger_device_command,
         )
     
+    if not hass.services.has_service(DOMAIN, "send_command_sequence"):
+        hass.services.async_register(
+            DOMAIN,
+            "send_command_sequence",
+            handle_send_command_sequence,
+            schema=SEND_COMMAND_SEQUENCE_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
+    
     if not hass.services.has_service(DOMAIN, "refresh_lists"):
         hass.services.async_register(
             DOMAIN,
@@ -232,13 +278,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Create coordinator
     coordinator = HaptiqueRS90Coordinator(hass, entry)
     
+    # Hydrate the last known catalog so platforms create all entities at once
+    await coordinator.async_load_cache()
+    
+    # Subscribe to MQTT topics and start coordinator (ConfigEntryNotReady if
+    # the subscription fails, so the setup is retried)
+    await coordinator.async_config_entry_first_refresh()
+    
     # Store coordinator
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = coordinator
     
-    # Subscribe to MQTT topics and start coordinator
-    await coordinator.async_config_entry_first_refresh()
-    
     # Setup platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
@@ -259,12 +309,24 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Store HA device ID in coordinator for event firing
     coordinator.device_id = device_entry.id
     
+    # Cache the HA device ID -> coordinator resolution for service calls
+    hass.data[DOMAIN].setdefault(DATA_DEVICE_COORDINATORS, {})[device_entry.id] = coordinator
+    
     # Register services
     await async_setup_services(hass)
+    async_register_websocket_commands(hass)
+    
+    # Reload when options change
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.debug("Unloading Haptique RS90 Remote integration")
@@ -279,6 +341,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         
         # Remove coordinator
         hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DOMAIN].get(DATA_DEVICE_COORDINATORS, {}).pop(coordinator.device_id, None)
     
     return unload_ok
 
@@ -286,3 +349,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle removal of an entry."""
     _LOGGER.debug("Removing Haptique RS90 Remote integration")
+    
+    # Remove the persisted catalog of this remote
+    store = Store(hass, STORAGE_VERSION, f"{STORAGE_KEY}.{entry.data[CONF_REMOTE_ID]}")
+    await store.async_remove()
@@ -0,0 +1,156 @@
+"""Battery refresh scheduling for Haptique RS90 Remote integration.
+
+The RS90 only reports its battery level when asked on battery/status, so the
+coordinator polls it. The interval follows the battery: short while charging
+or when low, and long when the level is stable. Each remote also gets a fixed
+phase from its ID, so a fleet of remotes does not poll at the same moment
+after a restart.
+
+The drain rate comes from a least-squares line over a rolling window of
+(time, level) samples. The fit sums are updated when a sample enters or
+leaves the window, so each sample costs O(1).
+"""
+from __future__ import annotations
+
+import zlib
+from collections import deque
+from typing import Any
+
+from .const import (
+    BATTERY_REFRESH_INTERVAL,
+    BATTERY_REFRESH_MIN_INTERVAL,
+    BATTERY_REFRESH_MAX_INTERVAL,
+    BATTERY_REFRESH_CHARGING_INTERVAL,
+    BATTERY_REFRESH_STAGGER,
+    BATTERY_LOW_LEVEL,
+    BATTERY_ESTIMATOR_WINDOW,
+    BATTERY_SAMPLE_MIN_SPACING,
+    BATTERY_CHARGE_JUMP,
+)
+
+
+def battery_refresh_offset(remote_id: str) -> float:
+    """Return the stable delay of a remote within the stagger period, in seconds."""
+    return zlib.crc32(remote_id.encode()) % 1000 / 1000 * BATTERY_REFRESH_STAGGER
+
+
+def battery_refresh_interval(
+    level: int | None, drain_per_hour: float | None, charging: bool
+) -> float:
+    """Return the delay until the next battery request, in seconds.
+
+    Args:
+        level: Last battery level in percent, None if unknown
+        drain_per_hour: Observed drain in percent per hour, None if unknown
+        charging: True if the level rose since the previous sample
+
+    Returns:
+        Interval aiming at about one percent of change between two requests
+    """
+    if charging:
+        return BATTERY_REFRESH_CHARGING_INTERVAL
+    if level is not None and level <= BATTERY_LOW_LEVEL:
+        return BATTERY_REFRESH_MIN_INTERVAL
+    if drain_per_hour is None:
+        return BATTERY_REFRESH_INTERVAL
+    if drain_per_hour <= 0:
+        return BATTERY_REFRESH_MAX_INTERVAL
+    return max(
+        BATTERY_REFRESH_MIN_INTERVAL,
+        min(BATTERY_REFRESH_MAX_INTERVAL, 3600 / drain_per_hour),
+    )
+
+
+class BatteryEstimator:
+    """Incremental linear fit of battery level over time."""
+
+    def __init__(self) -> None:
+        """Initialize an empty estimator."""
+        self._samples: deque[tuple[float, int]] = deque()  # (timestamp, level)
+        self._origin: float | None = None  # Timestamp of x = 0, keeps sums small
+        self._sum_x = 0.0  # Hours since origin
+        self._sum_y = 0.0
+        self._sum_xx = 0.0
+        self._sum_xy = 0.0
+        self.charging = False
+
+    def __len__(self) -> int:
+        """Return the number of samples in the window."""
+        return len(self._samples)
+
+    def add_sample(self, timestamp: float, level: int) -> bool:
+        """Add a battery sample.
+
+        A rise of BATTERY_CHARGE_JUMP or more starts a new discharge window.
+
+        Args:
+            timestamp: UNIX timestamp of the sample
+            level: Battery level in percent
+
+        Returns:
+            True if the sample was added to the window
+        """
+        if self._samples:
+            last_timestamp, last_level = self._samples[-1]
+            if level >= last_level + BATTERY_CHARGE_JUMP:
+                self.charging = True
+                self.clear()
+            elif level == last_level and timestamp - last_timestamp < BATTERY_SAMPLE_MIN_SPACING:
+                return False
+            else:
+                self.charging = level > last_level
+
+        if self._origin is None:
+            self._origin = timestamp
+        if len(self._samples) == BATTERY_ESTIMATOR_WINDOW:
+            self._update_sums(*self._samples.popleft(), -1)
+        self._samples.append((timestamp, level))
+        self._update_sums(timestamp, level, 1)
+        return True
+
+    def _update_sums(self, timestamp: float, level: int, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a sample from the fit sums."""
+        x = (timestamp - self._origin) / 3600
+        self._sum_x += sign * x
+        self._sum_y += sign * level
+        self._sum_xx += sign * x * x
+        self._sum_xy += sign * x * level
+
+    def clear(self) -> None:
+        """Drop all samples."""
+        self._samples.clear()
+        self._origin = None
+        self._sum_x = self._sum_y = self._sum_xx = self._sum_xy = 0.0
+
+    @property
+    def drain_rate(self) -> float | None:
+        """Return the fitted drain in percent per hour (negative if rising)."""
+        count = len(self._samples)
+        if count < 2:
+            return None
+        denominator = count * self._sum_xx - self._sum_x * self._sum_x
+        if denominator <= 1e-9:
+            return None
+        slope = (count * self._sum_xy - self._sum_x * self._sum_y) / denominator
+        return -slope
+
+    @property
+    def hours_remaining(self) -> float | None:
+        """Return the estimated hours until the battery is empty."""
+        drain_rate = self.drain_rate
+        if not self._samples or drain_rate is None or drain_rate <= 0 or self.charging:
+            return None
+        return self._samples[-1][1] / drain_rate
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the estimator state to persist."""
+        return {"samples": [list(sample) for sample in self._samples], "charging": self.charging}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> BatteryEstimator:
+        """Restore an estimator persisted with as_dict."""
+        estimator = cls()
+        for timestamp, level in (data or {}).get("samples", [])[-BATTERY_ESTIMATOR_WINDOW:]:
+            estimator.add_sample(timestamp, level)
+        estimator.charging = (data or {}).get("charging", False)
+        return estimator
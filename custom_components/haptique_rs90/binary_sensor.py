@@ -10,10 +10,10 @@ from homeassistant.components.binary_sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, CONF_REMOTE_ID, STATE_ONLINE
-from .coordinator import HaptiqueRS90Coordinator
+from .coordinator import DataKey, HaptiqueRS90Coordinator
+from .entity import HaptiqueRS90Entity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,7 +33,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class HaptiqueRS90ConnectionSensor(CoordinatorEntity, BinarySensorEntity):
+class HaptiqueRS90ConnectionSensor(HaptiqueRS90Entity, BinarySensorEntity):
     """Connection status sensor for Haptique RS90."""
 
     def __init__(
@@ -61,6 +61,11 @@ class HaptiqueRS90ConnectionSensor(CoordinatorEntity, BinarySensorEntity):
         """Return unique ID for the sensor."""
         return f"{self._remote_id}_connection"
 
+    @property
+    def data_keys(self) -> tuple[DataKey, ...]:
+        """Return the coordinator data keys this sensor reads."""
+        return ("status",)
+
     @property
     def is_on(self) -> bool:
         """Return true if the remote is online."""
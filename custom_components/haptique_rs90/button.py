@@ -7,10 +7,10 @@ from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, CONF_REMOTE_ID
-from .coordinator import HaptiqueRS90Coordinator
+from .coordinator import DataKey, HaptiqueRS90Coordinator
+from .entity import HaptiqueRS90Entity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,7 +30,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class HaptiqueRS90RGBButton(CoordinatorEntity, ButtonEntity):
+class HaptiqueRS90RGBButton(HaptiqueRS90Entity, ButtonEntity):
     """Button to trigger RGB Ring Light animation."""
 
     def __init__(
@@ -54,6 +54,11 @@ class HaptiqueRS90RGBButton(CoordinatorEntity, ButtonEntity):
             "identifiers": {(DOMAIN, self._remote_id)},
         }
 
+    @property
+    def data_keys(self) -> tuple[DataKey, ...]:
+        """Return the coordinator data keys this button reads."""
+        return ("status",)
+
     @property
     def available(self) -> bool:
         """Return True if entity is available."""
@@ -0,0 +1,167 @@
+"""Paced outbound command queue for Haptique RS90 Remote integration.
+
+The RS90 drops or reorders IR commands sent in quick succession to the same
+device. Commands are therefore queued per device and published one at a
+time with a minimum gap between them. Each device has its own worker, so
+commands for different devices still go out in parallel.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _DeviceQueue:
+    """Pending commands and counters of one device."""
+
+    def __init__(self) -> None:
+        """Initialize the device queue."""
+        # (topic, payload, delay_after, enqueued_at, future)
+        self.pending: deque[tuple[str, str, float, float, asyncio.Future]] = deque()
+        self.worker: asyncio.Task | None = None
+        self.current: asyncio.Future | None = None  # Command taken by the worker
+        self.last_sent: float | None = None
+        self.next_delay = 0.0  # Extra delay requested by the last sent command
+        self.sent = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+
+class CommandQueue:
+    """Per-device paced queue of outbound commands."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        publish: Callable[[str, str], Awaitable[None]],
+        min_gap: float,
+        max_depth: int,
+    ) -> None:
+        """Initialize the queue.
+
+        Args:
+            hass: Home Assistant instance
+            publish: Coroutine function publishing (topic, payload)
+            min_gap: Minimum time between two commands of a device, in seconds
+            max_depth: Maximum number of pending commands per device
+        """
+        self.hass = hass
+        self._publish = publish
+        self.min_gap = min_gap
+        self.max_depth = max_depth
+        self._devices: dict[str, _DeviceQueue] = {}
+
+    async def async_send(
+        self, device_name: str, topic: str, payload: str, delay_after: float = 0.0
+    ) -> dict[str, float]:
+        """Queue a command and wait until it is published.
+
+        Args:
+            device_name: Device the command is paced for
+            topic: MQTT topic to publish to
+            payload: Command payload
+            delay_after: Extra time to wait before the next command of the
+                device, on top of the minimum gap (in seconds)
+
+        Returns:
+            Timing of the command: queue wait and publish duration in seconds
+
+        Raises:
+            HomeAssistantError: If the device queue is full
+        """
+        device = self._devices.setdefault(device_name, _DeviceQueue())
+        if len(device.pending) >= self.max_depth:
+            device.dropped += 1
+            raise HomeAssistantError(
+                f"Command queue full for device '{device_name}' ({self.max_depth} pending)"
+            )
+
+        future: asyncio.Future = self.hass.loop.create_future()
+        device.pending.append((topic, payload, delay_after, time.monotonic(), future))
+        device.max_depth = max(device.max_depth, len(device.pending))
+
+        if device.worker is None or device.worker.done():
+            device.worker = self.hass.async_create_background_task(
+                self._async_run_worker(device_name, device),
+                f"haptique_rs90 command queue {device_name}",
+            )
+
+        return await future
+
+    async def _async_run_worker(self, device_name: str, device: _DeviceQueue) -> None:
+        """Publish the pending commands of a device, paced by the minimum gap."""
+        while device.pending:
+            topic, payload, delay_after, enqueued_at, future = device.pending.popleft()
+            if future.done():
+                continue
+            device.current = future
+
+            if device.last_sent is not None:
+                wait = device.last_sent + max(self.min_gap, device.next_delay) - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+            started = time.monotonic()
+            queue_wait = started - enqueued_at
+            try:
+                await self._publish(topic, payload)
+            except Exception as err:  # Reported to the caller
+                if not future.done():
+                    future.set_exception(err)
+            else:
+                if not future.done():
+                    future.set_result(
+                        {"queue_wait": queue_wait, "publish": time.monotonic() - started}
+                    )
+            finally:
+                device.current = None
+                device.last_sent = time.monotonic()
+                device.next_delay = delay_after
+                device.sent += 1
+                device.wait_total += queue_wait
+                device.wait_max = max(device.wait_max, queue_wait)
+
+        _LOGGER.debug("Command queue drained for device: %s", device_name)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return queue depth, wait time and drop counters per device."""
+        return {
+            "min_gap_ms": round(self.min_gap * 1000),
+            "max_depth": self.max_depth,
+            "devices": {
+                device_name: {
+                    "depth": len(device.pending),
+                    "max_depth_seen": device.max_depth,
+                    "sent": device.sent,
+                    "dropped": device.dropped,
+                    "avg_wait_ms": round(device.wait_total / device.sent * 1000, 1) if device.sent else None,
+                    "max_wait_ms": round(device.wait_max * 1000, 1),
+                }
+                for device_name, device in self._devices.items()
+            },
+        }
+
+    async def async_shutdown(self) -> None:
+        """Cancel the workers and every pending command."""
+        for device in self._devices.values():
+            while device.pending:
+                future = device.pending.popleft()[4]
+                if not future.done():
+                    future.cancel()
+            # Already popped by the worker: its caller would wait forever
+            if device.current is not None and not device.current.done():
+                device.current.cancel()
+            if device.worker is not None and not device.worker.done():
+                device.worker.cancel()
+        self._devices.clear()
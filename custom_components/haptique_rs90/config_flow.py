@@ -13,7 +13,31 @@ from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import selector
 
-from .const import DOMAIN, CONF_REMOTE_ID, CONF_NAME
+from .const import (
+    DOMAIN,
+    CONF_REMOTE_ID,
+    CONF_NAME,
+    CONF_UPDATE_COALESCING,
+    CONF_UPDATE_COALESCING_WINDOW,
+    CONF_KEYMAP,
+    CONF_COMMAND_GAP,
+    CONF_DETAIL_CONCURRENCY,
+    CONF_LAZY_CATALOG,
+    CONF_PREFETCH_DEVICES,
+    CONF_COMMAND_ATTRIBUTES,
+    CONF_RECORDER_FRIENDLY,
+    COALESCING_MODES,
+    DEFAULT_UPDATE_COALESCING,
+    DEFAULT_UPDATE_COALESCING_WINDOW,
+    DEFAULT_COMMAND_GAP,
+    DEFAULT_DETAIL_CONCURRENCY,
+    DATA_HUB,
+    TOPIC_BASE,
+    TOPIC_STATUS,
+    DISCOVERY_TIMEOUT,
+    DISCOVERY_COLLECT_WINDOW,
+)
+from .keymap import KeymapError, parse_keymap
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,8 +58,8 @@ class HaptiqueRS90ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             return self.async_abort(reason="mqtt_not_configured")
 
         if user_input is not None:
-            # Use the discovered remote_id or default
-            remote_id = self.context.get("remote_id", "")
+            # Remote chosen in the form, or the single discovered remote
+            remote_id = user_input.get(CONF_REMOTE_ID) or self.context.get("remote_id", "")
             
             if not remote_id:
                 errors["base"] = "no_remote_found"
@@ -54,22 +78,26 @@ class HaptiqueRS90ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     },
                 )
 
-        # Try to discover remote automatically
-        discovered_remote = await self._discover_remote()
+        # Try to discover remotes automatically
+        discovered_remotes = await self._discover_remotes()
+        schema: dict[Any, Any] = {}
         
-        if discovered_remote:
-            self.context["remote_id"] = discovered_remote
-            remote_display = f"{discovered_remote[:8]}..."
+        if len(discovered_remotes) > 1:
+            # Several unconfigured remotes: let the user choose
+            schema[vol.Required(CONF_REMOTE_ID, default=discovered_remotes[0])] = vol.In(
+                discovered_remotes
+            )
+            remote_display = ", ".join(discovered_remotes)
+        elif discovered_remotes:
+            self.context["remote_id"] = discovered_remotes[0]
+            remote_display = f"{discovered_remotes[0][:8]}..."
         else:
             remote_display = "Non trouvé"
             errors["base"] = "no_remote_found"
 
         # Show configuration form
-        data_schema = vol.Schema(
-            {
-                vol.Optional(CONF_NAME, default=f"RS90 Salon"): str,
-            }
-        )
+        schema[vol.Optional(CONF_NAME, default=f"RS90 Salon")] = str
+        data_schema = vol.Schema(schema)
 
         return self.async_show_form(
             step_id="user",
@@ -80,34 +108,59 @@ class HaptiqueRS90ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             },
         )
 
-    async def _discover_remote(self) -> str | None:
-        """Try to discover a Haptique RS90 remote on MQTT."""
-        _LOGGER.info("Attempting to discover Haptique RS90 remote...")
+    async def _discover_remotes(self) -> list[str]:
+        """Discover the unconfigured Haptique RS90 remotes on MQTT.
+        
+        Reuses the status cache of the shared hub when another remote is
+        already set up. Otherwise waits for the first retained status (at
+        most DISCOVERY_TIMEOUT), then briefly collects the other ones.
         
-        discovered_id = None
+        Returns:
+            Sorted list of unconfigured remote IDs
+        """
+        _LOGGER.info("Attempting to discover Haptique RS90 remotes...")
+        configured = self._async_current_ids()
+        
+        hub = self.hass.data.get(DOMAIN, {}).get(DATA_HUB)
+        if hub is not None:
+            cached = sorted(hub.get_status_remote_ids() - configured)
+            if cached:
+                _LOGGER.info("Discovered Haptique RS90 from hub cache: %s", cached)
+                return cached
+        
+        discovered: set[str] = set()
+        first_seen = asyncio.Event()
         
         @callback
         def remote_discovered(msg):
             """Handle discovered remote."""
-            nonlocal discovered_id
             # Extract remote ID from topic: Haptique/{RemoteID}/status
             topic_parts = msg.topic.split("/")
-            if len(topic_parts) >= 2 and topic_parts[0] == "Haptique":
-                discovered_id = topic_parts[1]
-                _LOGGER.info("Discovered Haptique RS90 with ID: %s", discovered_id)
+            if len(topic_parts) < 2 or topic_parts[0] != TOPIC_BASE:
+                return
+            remote_id = topic_parts[1]
+            if remote_id in configured or remote_id in discovered:
+                return
+            discovered.add(remote_id)
+            first_seen.set()
+            _LOGGER.info("Discovered Haptique RS90 with ID: %s", remote_id)
         
         # Subscribe to discovery topic
         unsubscribe = await mqtt.async_subscribe(
-            self.hass, "Haptique/+/status", remote_discovered, qos=1
+            self.hass, f"{TOPIC_BASE}/+/{TOPIC_STATUS}", remote_discovered, qos=1
         )
         
-        # Wait a bit for discovery
-        await asyncio.sleep(2)
+        try:
+            # Retained statuses arrive in a burst: return shortly after the first
+            async with asyncio.timeout(DISCOVERY_TIMEOUT):
+                await first_seen.wait()
+            await asyncio.sleep(DISCOVERY_COLLECT_WINDOW)
+        except TimeoutError:
+            _LOGGER.debug("No remote found within %.1fs", DISCOVERY_TIMEOUT)
+        finally:
+            unsubscribe()
         
-        # Unsubscribe
-        unsubscribe()
-        
-        return discovered_id
+        return sorted(discovered)
 
     @staticmethod
     @callback
@@ -129,17 +182,33 @@ class HaptiqueRS90OptionsFlow(config_entries.OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Manage the options."""
+        errors: dict[str, str] = {}
+        
         if user_input is not None:
-            # Update config entry with new name
+            try:
+                parse_keymap(user_input.get(CONF_KEYMAP))
+            except KeymapError as err:
+                _LOGGER.warning("Invalid keymap: %s", err)
+                errors[CONF_KEYMAP] = "invalid_keymap"
+        
+        if user_input is not None and not errors:
+            # The name goes to the entry data, everything else to the options
+            options = {
+                key: value for key, value in user_input.items() if key != CONF_NAME
+            }
+            # One update for both, so the entry reloads once: saving the same
+            # options again below is a no-op and does not notify listeners
             self.hass.config_entries.async_update_entry(
                 self._config_entry,
                 data={
                     **self._config_entry.data,
                     CONF_NAME: user_input[CONF_NAME],
                 },
+                options=options,
             )
-            return self.async_create_entry(title="", data={})
+            return self.async_create_entry(title="", data=options)
 
+        options = self._config_entry.options
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema(
@@ -151,6 +220,51 @@ class HaptiqueRS90OptionsFlow(config_entries.OptionsFlow):
                             f"RS90 {self._config_entry.data[CONF_REMOTE_ID][:8]}"
                         ),
                     ): str,
+                    vol.Optional(
+                        CONF_UPDATE_COALESCING,
+                        default=options.get(
+                            CONF_UPDATE_COALESCING, DEFAULT_UPDATE_COALESCING
+                        ),
+                    ): vol.In(COALESCING_MODES),
+                    vol.Optional(
+                        CONF_UPDATE_COALESCING_WINDOW,
+                        default=options.get(
+                            CONF_UPDATE_COALESCING_WINDOW, DEFAULT_UPDATE_COALESCING_WINDOW
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+                    vol.Optional(
+                        CONF_COMMAND_GAP,
+                        default=options.get(CONF_COMMAND_GAP, DEFAULT_COMMAND_GAP),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=2000)),
+                    vol.Optional(
+                        CONF_DETAIL_CONCURRENCY,
+                        default=options.get(
+                            CONF_DETAIL_CONCURRENCY, DEFAULT_DETAIL_CONCURRENCY
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=20)),
+                    vol.Optional(
+                        CONF_LAZY_CATALOG,
+                        default=options.get(CONF_LAZY_CATALOG, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_PREFETCH_DEVICES,
+                        default=options.get(CONF_PREFETCH_DEVICES, ""),
+                    ): str,
+                    vol.Optional(
+                        CONF_COMMAND_ATTRIBUTES,
+                        default=options.get(CONF_COMMAND_ATTRIBUTES, True),
+                    ): bool,
+                    vol.Optional(
+                        CONF_RECORDER_FRIENDLY,
+                        default=options.get(CONF_RECORDER_FRIENDLY, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_KEYMAP,
+                        default=options.get(CONF_KEYMAP, ""),
+                    ): selector.TextSelector(
+                        selector.TextSelectorConfig(multiline=True)
+                    ),
                 }
             ),
+            errors=errors,
         )
@@ -16,6 +16,20 @@ TOPIC_DEVICE_TRIGGER = "device/{device_name}/trigger"
 TOPIC_TEST_STATUS = "test/status"
 TOPIC_LED_LIGHT = "ledlight/on"  # RGB ring light control
 
+# hass.data[DOMAIN] keys (besides config entry IDs)
+DATA_DEVICE_COORDINATORS = "device_coordinators"  # HA device ID -> coordinator cache
+DATA_HUB = "hub"  # Shared MQTT subscription and dispatcher (see hub.py)
+DATA_WEBSOCKET_REGISTERED = "websocket_registered"  # Websocket commands registered once
+
+# Websocket commands (see websocket_api.py)
+WS_TYPE_CATALOG = f"{DOMAIN}/catalog"
+WS_CATALOG_LOAD_TIMEOUT = 5.0  # Seconds to wait for on-demand commands before answering
+
+# Events and dispatcher signals
+EVENT_KEY_PRESSED = f"{DOMAIN}_key_pressed"
+# Per-button signal, so a key press only reaches the triggers bound to it
+SIGNAL_BUTTON_PRESSED = f"{DOMAIN}_button_pressed_{{device_id}}_{{button}}"
+
 # Attributes
 ATTR_REMOTE_ID = "remote_id"
 ATTR_DEVICE_NAME = "device_name"
@@ -27,7 +41,67 @@ ATTR_BUTTON_NUMBER = "button_number"
 CONF_REMOTE_ID = "remote_id"
 CONF_NAME = "name"
 
+# Options
+CONF_UPDATE_COALESCING = "update_coalescing"
+CONF_UPDATE_COALESCING_WINDOW = "update_coalescing_window"
+CONF_KEYMAP = "keymap"  # Local button -> device command/macro mappings (see keymap.py)
+CONF_COMMAND_GAP = "command_gap"  # Minimum gap between two commands of a device (ms)
+CONF_DETAIL_CONCURRENCY = "detail_concurrency"  # Parallel device detail requests
+CONF_LAZY_CATALOG = "lazy_catalog"  # Fetch device commands only when first needed
+CONF_PREFETCH_DEVICES = "prefetch_devices"  # Devices always fetched in lazy mode
+CONF_COMMAND_ATTRIBUTES = "command_attributes"  # command_1..command_N sensor attributes
+CONF_RECORDER_FRIENDLY = "recorder_friendly"  # Fewer and smaller recorded states
+
+# Update coalescing modes
+COALESCING_OFF = "off"  # Notify listeners on every update
+COALESCING_LOOP = "loop"  # Merge updates made within one event loop iteration
+COALESCING_WINDOW = "window"  # Merge updates made within a short time window
+COALESCING_MODES = [COALESCING_OFF, COALESCING_LOOP, COALESCING_WINDOW]
+DEFAULT_UPDATE_COALESCING = COALESCING_OFF
+DEFAULT_UPDATE_COALESCING_WINDOW = 50  # Milliseconds
+
+# Outbound device command queue (see command_queue.py)
+DEFAULT_COMMAND_GAP = 100  # Milliseconds
+COMMAND_QUEUE_MAX_DEPTH = 50  # Pending commands per device before dropping
+
+# Recorder-friendly mode
+LAST_KEY_MIN_WRITE_INTERVAL = 1.0  # Seconds between two Last Key Pressed states
+
+# Device detail requests (see detail_fetcher.py)
+DEFAULT_DETAIL_CONCURRENCY = 4  # Outstanding detail requests
+DETAIL_REQUEST_TIMEOUT = 5.0  # Seconds to wait for the commands answer
+DETAIL_REQUEST_RETRIES = 2  # Extra attempts after a timeout
+DETAIL_RETRY_BACKOFF = 2.0  # Seconds before the first retry, doubled each time
+DETAIL_RETRY_BACKOFF_MAX = 60.0  # Upper bound of the retry delay in seconds
+UNROUTED_PAYLOADS_MAX = 64  # Payloads kept for devices/macros not routed yet
+
 # States
 STATE_ONLINE = "online"
 STATE_OFFLINE = "offline"
 
+
+# Storage (last known catalog, one store per remote)
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.catalog"
+STORAGE_SAVE_DELAY = 10  # Seconds, coalesces bursts of list/commands updates
+
+# Initial sync (retained message replay after subscribing)
+INITIAL_SYNC_QUIET_PERIOD = 1.0  # Seconds without updates before the replay is settled
+INITIAL_SYNC_TIMEOUT = 15.0  # Upper bound of the initial sync phase in seconds
+
+# Config flow discovery (Haptique/+/status)
+DISCOVERY_TIMEOUT = 2.0  # Upper bound of the wait for a first remote in seconds
+DISCOVERY_COLLECT_WINDOW = 0.25  # Extra time to collect the other retained statuses
+
+# Battery refresh scheduling (battery/status requests)
+BATTERY_REFRESH_INTERVAL = 3600  # Seconds, used until a drain rate is known
+BATTERY_REFRESH_MIN_INTERVAL = 600  # Seconds, low battery
+BATTERY_REFRESH_MAX_INTERVAL = 14400  # Seconds, stable battery
+BATTERY_REFRESH_CHARGING_INTERVAL = 900  # Seconds, follow the charge closely
+BATTERY_REFRESH_STAGGER = 60  # Seconds over which remotes spread their requests
+BATTERY_LOW_LEVEL = 20  # Percent
+
+# Battery drain estimation (rolling linear fit of battery samples)
+BATTERY_ESTIMATOR_WINDOW = 48  # Samples kept in the fit
+BATTERY_SAMPLE_MIN_SPACING = 300  # Seconds, closer samples are not added
+BATTERY_CHARGE_JUMP = 2  # Percent rise treated as charge/new batteries
@@ -4,17 +4,46 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import secrets
 import time
+from collections.abc import Callable, Iterable
+from functools import partial
+from datetime import datetime, timedelta
 from typing import Any
 
 from homeassistant.components import mqtt
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
     CONF_REMOTE_ID,
+    CONF_UPDATE_COALESCING,
+    CONF_UPDATE_COALESCING_WINDOW,
+    CONF_KEYMAP,
+    CONF_COMMAND_GAP,
+    CONF_DETAIL_CONCURRENCY,
+    CONF_LAZY_CATALOG,
+    CONF_PREFETCH_DEVICES,
+    CONF_RECORDER_FRIENDLY,
+    LAST_KEY_MIN_WRITE_INTERVAL,
+    COALESCING_OFF,
+    COALESCING_LOOP,
+    DEFAULT_UPDATE_COALESCING,
+    DEFAULT_UPDATE_COALESCING_WINDOW,
+    DEFAULT_COMMAND_GAP,
+    COMMAND_QUEUE_MAX_DEPTH,
+    DEFAULT_DETAIL_CONCURRENCY,
+    DETAIL_REQUEST_TIMEOUT,
+    DETAIL_REQUEST_RETRIES,
+    DETAIL_RETRY_BACKOFF,
+    DETAIL_RETRY_BACKOFF_MAX,
     TOPIC_BASE,
     TOPIC_STATUS,
     TOPIC_DEVICE_LIST,
@@ -24,12 +53,195 @@ from .const import (
     TOPIC_KEYS,
     TOPIC_TEST_STATUS,
     TOPIC_LED_LIGHT,
+    EVENT_KEY_PRESSED,
+    SIGNAL_BUTTON_PRESSED,
     STATE_ONLINE,
     STATE_OFFLINE,
+    STORAGE_VERSION,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY,
+    INITIAL_SYNC_QUIET_PERIOD,
+    INITIAL_SYNC_TIMEOUT,
+    UNROUTED_PAYLOADS_MAX,
 )
 
+from .battery import BatteryEstimator, battery_refresh_interval, battery_refresh_offset
+from .command_queue import CommandQueue
+from .detail_fetcher import DetailFetcher
+from .hub import async_get_hub
+from .keymap import KEYMAP_DEVICE, KeymapError, parse_keymap
+
 _LOGGER = logging.getLogger(__name__)
 
+# A data key is either a top-level key of coordinator.data ("battery_level")
+# or a (key, item) slice of a dict-valued key (("macro_states", "Watch TV")).
+DataKey = str | tuple[str, str]
+
+
+def _items_by_id(items: list[dict[str, Any]]) -> dict[str, str]:
+    """Return id -> name of normalized devices or macros (name if no id)."""
+    return {item.get("id") or item["name"]: item["name"] for item in items if item.get("name")}
+
+
+class TopicRouter:
+    """Route messages of one `<prefix>+<suffix>` wildcard subscription.
+    
+    Handlers are kept in a table keyed by the `+` segment (device or macro
+    name), so one broker subscription serves every device or macro. Payloads
+    for segments without a handler yet (retained messages delivered before
+    the device/macro list) are kept and replayed when the handler is added,
+    up to max_unrouted of them, the oldest being dropped first.
+    """
+
+    def __init__(
+        self, prefix: str, suffix: str, max_unrouted: int = UNROUTED_PAYLOADS_MAX
+    ) -> None:
+        """Initialize the router."""
+        self.prefix = prefix
+        self.suffix = suffix
+        self.topic = f"{prefix}+{suffix}"
+        self.max_unrouted = max_unrouted
+        self._handlers: dict[str, Callable[[str], None]] = {}
+        self._unrouted: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        """Return the number of routed segments."""
+        return len(self._handlers)
+
+    @callback
+    def async_add_route(self, segment: str, handler: Callable[[str], None]) -> CALLBACK_TYPE:
+        """Route messages for a segment to handler.
+        
+        Returns:
+            Function removing the route
+        """
+        self._handlers[segment] = handler
+        payload = self._unrouted.pop(segment, None)
+        if payload is not None:
+            handler(payload)
+        
+        @callback
+        def remove_route() -> None:
+            """Remove the route if it still belongs to this handler."""
+            if self._handlers.get(segment) is handler:
+                del self._handlers[segment]
+        
+        return remove_route
+
+    @callback
+    def async_remove_route(self, segment: str) -> None:
+        """Remove the route and any pending payload for a segment."""
+        self._handlers.pop(segment, None)
+        self._unrouted.pop(segment, None)
+
+    @callback
+    def async_route(self, topic: str, payload: str) -> None:
+        """Dispatch a message received on the wildcard subscription."""
+        segment = topic[len(self.prefix):-len(self.suffix)]
+        handler = self._handlers.get(segment)
+        if handler is None:
+            if self.max_unrouted <= 0:
+                _LOGGER.debug("No route for '%s' - dropping payload", topic)
+                return
+            _LOGGER.debug("No route for '%s' yet - keeping payload", topic)
+            self._unrouted.pop(segment, None)
+            self._unrouted[segment] = payload
+            if len(self._unrouted) > self.max_unrouted:
+                del self._unrouted[next(iter(self._unrouted))]
+            return
+        handler(payload)
+
+
+class SubscriptionManager:
+    """Track the topic routes of devices or macros by their stable RS90 id.
+    
+    Keying by id instead of name means a removed item always releases its
+    route, and a renamed item moves its route instead of being handled as
+    a removal plus an addition.
+    """
+
+    def __init__(
+        self,
+        router: TopicRouter,
+        handler_factory: Callable[[str], Callable[[str], None]],
+    ) -> None:
+        """Initialize the manager.
+        
+        Args:
+            router: Router the routes are added to
+            handler_factory: Returns the message handler for an item name
+        """
+        self._router = router
+        self._handler_factory = handler_factory
+        self._names: dict[str, str] = {}  # Item id -> routed name
+        self._removers: dict[str, CALLBACK_TYPE] = {}
+        self.released = 0
+        self.migrated = 0
+
+    def __len__(self) -> int:
+        """Return the number of live routes."""
+        return len(self._names)
+
+    @property
+    def names(self) -> set[str]:
+        """Return the routed names."""
+        return set(self._names.values())
+
+    @callback
+    def async_reconcile(
+        self, items: dict[str, str]
+    ) -> tuple[list[str], list[str], list[tuple[str, str]]]:
+        """Bring the routes in line with the current item list.
+        
+        Args:
+            items: Item id -> name (items without id use their name as id)
+        
+        Returns:
+            Added names, removed names and (old name, new name) renames
+        """
+        added: list[str] = []
+        removed: list[str] = []
+        renamed: list[tuple[str, str]] = []
+        
+        for item_id in [item_id for item_id in self._names if item_id not in items]:
+            removed.append(self._async_release(item_id))
+        
+        for item_id, name in items.items():
+            old_name = self._names.get(item_id)
+            if old_name == name:
+                continue
+            if old_name is not None:
+                self._async_release(item_id)
+                renamed.append((old_name, name))
+                self.migrated += 1
+            else:
+                added.append(name)
+            self._names[item_id] = name
+            self._removers[item_id] = self._router.async_add_route(
+                name, self._handler_factory(name)
+            )
+        
+        # Drop payloads kept for names nobody routes anymore
+        routed = self.names
+        for name in removed + [old_name for old_name, _ in renamed]:
+            if name not in routed:
+                self._router.async_remove_route(name)
+        
+        return added, removed, renamed
+
+    @callback
+    def _async_release(self, item_id: str) -> str:
+        """Release the route of an item and return its name."""
+        self._removers.pop(item_id)()
+        self.released += 1
+        return self._names.pop(item_id)
+
+    @callback
+    def async_clear(self) -> None:
+        """Release every route."""
+        for item_id in list(self._names):
+            self._async_release(item_id)
+
 
 class HaptiqueRS90Coordinator(DataUpdateCoordinator):
     """Class to manage fetching Haptique RS90 data from MQTT."""
@@ -47,20 +259,150 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
         self.entry = entry
         self.remote_id = entry.data[CONF_REMOTE_ID]
         self.device_id = None  # Will be set after device registration
-        self._subscriptions: list[callable] = []  # Global subscriptions (status, battery, etc.)
-        self._macro_subscriptions: dict[str, callable] = {}  # Macro-specific subscriptions
+        # Handler table of the shared hub subscription, keyed by the topic
+        # relative to base_topic (keys have their own fast path)
+        self._topic_handlers: dict[str, Callable[[str], None]] = {
+            TOPIC_STATUS: self._handle_status,
+            TOPIC_DEVICE_LIST: self._handle_device_list,
+            TOPIC_MACRO_LIST: self._handle_macro_list,
+            TOPIC_BATTERY_LEVEL: self._handle_battery,
+            TOPIC_TEST_STATUS: self._handle_test_status,
+        }
+        self._hub_registered = False
+        
+        # Lazy catalog: only prefetched devices and devices used at runtime
+        # (ids, or names for devices without id) get their commands fetched
+        self._lazy_catalog: bool = entry.options.get(CONF_LAZY_CATALOG, False)
+        
+        # Device commands and macro triggers, routed by device/macro name.
+        # In lazy mode commands of devices nobody asked for are dropped, an
+        # unused catalog is not kept in memory; they are requested on use.
+        self._command_router = TopicRouter(
+            "device/", "/commands", max_unrouted=0 if self._lazy_catalog else UNROUTED_PAYLOADS_MAX
+        )
+        self._macro_router = TopicRouter("macro/", "/trigger")
         
-        # Track subscribed devices and macros to handle add/remove
-        self._subscribed_devices: set[str] = set()
-        self._subscribed_macros: set[str] = set()
+        # Device/macro routes keyed by stable id, to handle add/remove/rename
+        self._device_routes = SubscriptionManager(
+            self._command_router,
+            lambda device_name: partial(self._handle_device_commands, device_name),
+        )
+        self._macro_routes = SubscriptionManager(
+            self._macro_router,
+            lambda macro_name: partial(self._handle_macro_trigger, macro_name),
+        )
         
-        # Battery refresh timer
-        self._battery_refresh_timer: callable | None = None
-        self._battery_refresh_interval = 3600  # 1 hour in seconds
+        # Adaptive battery refresh (see battery.py)
+        self._battery_refresh_timer: CALLBACK_TYPE | None = None
+        self._battery_refresh_interval: float | None = None
+        self._battery_refresh_next: datetime | None = None
+        self._battery_refresh_skipped = 0  # Requests skipped while offline
+        self._battery_refresh_missed = False  # Request owed once back online
+        self._battery_estimator = BatteryEstimator()  # Drain rate, persisted
         
         # LED light auto-off timer
         self._led_light_timer: callable | None = None
         
+        # Last known catalog, persisted across restarts
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY}.{self.remote_id}"
+        )
+        
+        # Fingerprint (length, hash) of the last payload per list/commands topic,
+        # used to skip the RS90's identical retained republishes before parsing
+        self._payload_fingerprints: dict[str, tuple[int, int]] = {}
+        self._duplicate_payloads_skipped = 0
+        
+        # Listeners registered for a single data key (see async_add_key_listener)
+        self._key_listeners: dict[DataKey, list[CALLBACK_TYPE]] = {}
+        
+        # Initial sync: while the broker replays retained messages, handlers
+        # only mutate state and the updated keys are published once at the end
+        self._sync_pending_keys: dict[DataKey, None] | None = None
+        self._sync_started: float | None = None
+        self._sync_duration: float | None = None
+        self._sync_end_reason: str | None = None
+        self._sync_device_list_seen = False
+        self._sync_commands_reported: set[str] = set()
+        self._sync_quiet_timer: CALLBACK_TYPE | None = None
+        self._sync_timeout_timer: CALLBACK_TYPE | None = None
+        
+        # Key event latency (MQTT receive -> event fired), in seconds
+        self._key_latency_count = 0
+        self._key_latency_total = 0.0
+        self._key_latency_last: float | None = None
+        self._key_latency_max = 0.0
+        
+        # Catalog indexes, rebuilt only when a list or command payload changes
+        self._device_names_by_id: dict[str, str] = {}
+        self._device_ids_by_name: dict[str, str] = {}
+        self._macro_names_by_id: dict[str, str] = {}
+        self._macro_ids_by_name: dict[str, str] = {}
+        self._command_ids_by_device: dict[str, frozenset[str]] = {}
+        # Version of each device's command list (from one global counter, so
+        # a removed and re-added device never gets an old number back)
+        self._commands_versions: dict[str, int] = {}
+        self._commands_version = 0
+        # Versions restart with the coordinator: the epoch keeps etags unique
+        self._catalog_epoch = secrets.token_hex(4)
+        
+        # Paced outbound device commands (one worker per device)
+        self._command_queue = CommandQueue(
+            hass,
+            self._async_publish_device_command,
+            entry.options.get(CONF_COMMAND_GAP, DEFAULT_COMMAND_GAP) / 1000,
+            COMMAND_QUEUE_MAX_DEPTH,
+        )
+        
+        # Device detail requests, bounded and tracked (see detail_fetcher.py)
+        self._detail_fetcher = DetailFetcher(
+            hass,
+            lambda device_name: self._async_request_device_details(device_name),
+            entry.options.get(CONF_DETAIL_CONCURRENCY, DEFAULT_DETAIL_CONCURRENCY),
+            DETAIL_REQUEST_TIMEOUT,
+            DETAIL_REQUEST_RETRIES,
+            DETAIL_RETRY_BACKOFF,
+            DETAIL_RETRY_BACKOFF_MAX,
+        )
+        
+        # Devices always fetched, and devices used at runtime, in lazy mode
+        self._prefetch_devices = {
+            device.strip()
+            for device in entry.options.get(CONF_PREFETCH_DEVICES, "").split(",")
+            if device.strip()
+        }
+        self._wanted_devices: set[str] = set()
+        
+        # Local keymap: button -> (kind, target, payload) from the options, and
+        # the precompiled button -> (kind, name, topic, payload) actions
+        try:
+            self._keymap = parse_keymap(entry.options.get(CONF_KEYMAP))
+        except KeymapError as err:
+            _LOGGER.error("Invalid keymap option, ignoring it: %s", err)
+            self._keymap = {}
+        self._keymap_actions: dict[int, tuple[str, str, str, str]] = {}
+        self._keymap_actions_run = 0
+        
+        # Update coalescing: merge key updates made within one loop iteration
+        # or a short window into a single notification (see options flow)
+        self._coalescing_mode: str = entry.options.get(
+            CONF_UPDATE_COALESCING, DEFAULT_UPDATE_COALESCING
+        )
+        self._coalescing_window: float = entry.options.get(
+            CONF_UPDATE_COALESCING_WINDOW, DEFAULT_UPDATE_COALESCING_WINDOW
+        ) / 1000
+        self._coalesced_keys: dict[DataKey, None] = {}
+        self._coalescing_flush: CALLBACK_TYPE | None = None
+        self._coalesced_updates = 0  # Updates merged into an earlier notification
+        
+        # Recorder-friendly mode: last_key listeners are notified at most once
+        # per LAST_KEY_MIN_WRITE_INTERVAL, plus a trailing notification with the
+        # latest key (key press events and triggers are not affected)
+        self._recorder_friendly: bool = entry.options.get(CONF_RECORDER_FRIENDLY, False)
+        self._last_key_notified = float("-inf")
+        self._last_key_trailing: CALLBACK_TYPE | None = None
+        self._last_key_writes_suppressed = 0
+        
         # Data storage
         self.data: dict[str, Any] = {
             "status": STATE_OFFLINE,
@@ -75,6 +417,15 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
             "led_light_state": "off",  # RGB ring light state
             "led_light_duration": 5,  # Default duration in seconds
         }
+        # Macros currently on -> start time, in start order: the last one is
+        # the most recently started (see _async_set_macro_state)
+        self._active_macros: dict[str, datetime] = {}
+        
+        # Bumped only when the normalized device/macro list really changes, so
+        # entity reconciliation can skip notifications that did not touch it
+        self.devices_version = 0
+        self.macros_version = 0
+        self._async_compile_keymap()
         
         _LOGGER.info("Coordinator initialized - updates via MQTT only")
 
@@ -83,6 +434,223 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
         """Return base MQTT topic for this remote."""
         return f"{TOPIC_BASE}/{self.remote_id}"
 
+    @callback
+    def async_add_key_listener(self, key: DataKey, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for updates of a single data key.
+        
+        Unlike async_add_listener, the callback only runs when a handler
+        updates this key (or, for a top-level key, one of its slices).
+        
+        Returns:
+            Function removing the listener
+        """
+        self._key_listeners.setdefault(key, []).append(update_callback)
+        
+        @callback
+        def remove_listener() -> None:
+            """Remove the key listener."""
+            listeners = self._key_listeners.get(key)
+            if listeners and update_callback in listeners:
+                listeners.remove(update_callback)
+                if not listeners:
+                    del self._key_listeners[key]
+        
+        return remove_listener
+
+    @callback
+    def async_update_keys(self, *keys: DataKey) -> None:
+        """Notify the listeners of the given data keys.
+        
+        Updating a slice such as ("macro_states", name) also notifies the
+        listeners of its parent key "macro_states". Each listener runs at
+        most once per call, even if it is registered for several keys.
+        
+        During the initial sync the keys are only collected and notified
+        once the retained message replay has settled. With update coalescing
+        enabled, keys updated within one loop iteration (or time window) are
+        merged into a single notification.
+        """
+        if self._sync_pending_keys is not None:
+            self._sync_pending_keys.update(dict.fromkeys(keys))
+            self._async_initial_sync_activity()
+            return
+        
+        if self._coalescing_mode == COALESCING_OFF:
+            self._async_notify_keys(keys)
+            return
+        
+        if self._coalescing_flush is not None:
+            self._coalesced_updates += 1
+        else:
+            self._async_schedule_coalesced_flush()
+        self._coalesced_keys.update(dict.fromkeys(keys))
+
+    @callback
+    def _async_schedule_coalesced_flush(self) -> None:
+        """Schedule the notification of the coalesced keys."""
+        if self._coalescing_mode == COALESCING_LOOP:
+            handle = self.hass.loop.call_soon(self._async_flush_coalesced_keys)
+            self._coalescing_flush = handle.cancel
+        else:
+            self._coalescing_flush = async_call_later(
+                self.hass, self._coalescing_window, self._async_flush_coalesced_keys
+            )
+
+    @callback
+    def _async_flush_coalesced_keys(self, _now=None) -> None:
+        """Notify all keys updated since the flush was scheduled."""
+        self._coalescing_flush = None
+        keys = self._coalesced_keys
+        self._coalesced_keys = {}
+        self._async_notify_keys(keys)
+
+    @callback
+    def _async_notify_keys(self, keys: Iterable[DataKey]) -> None:
+        """Run the listeners of the given keys, each at most once."""
+        to_call: dict[CALLBACK_TYPE, None] = {}
+        for key in keys:
+            for update_callback in self._key_listeners.get(key, ()):
+                to_call[update_callback] = None
+            if isinstance(key, tuple):
+                for update_callback in self._key_listeners.get(key[0], ()):
+                    to_call[update_callback] = None
+        
+        for update_callback in to_call:
+            update_callback()
+
+    async def async_load_cache(self) -> None:
+        """Hydrate devices, macros and command catalogs from the last run.
+        
+        Called before the platforms are set up so all entities are created in
+        one batch. Live MQTT data then reconciles the catalog as it arrives.
+        """
+        try:
+            cached = await self._store.async_load()
+        except Exception as err:
+            _LOGGER.error("✗ Failed to load cached catalog: %s", err)
+            return
+        
+        if not cached:
+            _LOGGER.debug("No cached catalog for remote %s", self.remote_id)
+            return
+        
+        self.data["devices"] = cached.get("devices", [])
+        self.data["macros"] = cached.get("macros", [])
+        self.data["device_commands"] = cached.get("device_commands", {})
+        self.devices_version += 1
+        self.macros_version += 1
+        self._battery_estimator = BatteryEstimator.from_dict(cached.get("battery"))
+        self._rebuild_device_index()
+        self._rebuild_macro_index()
+        for device_name, commands in self.data["device_commands"].items():
+            self._index_commands(device_name, commands)
+        self._async_compile_keymap()
+        _LOGGER.info(
+            "Loaded cached catalog: %d devices, %d macros, %d command lists",
+            len(self.data["devices"]),
+            len(self.data["macros"]),
+            len(self.data["device_commands"]),
+        )
+
+    @callback
+    def _async_schedule_cache_save(self) -> None:
+        """Schedule a delayed save of the catalog."""
+        self._store.async_delay_save(self._cache_data, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _cache_data(self) -> dict[str, Any]:
+        """Return the catalog to persist."""
+        return {
+            "devices": self.data["devices"],
+            "macros": self.data["macros"],
+            "device_commands": self.data["device_commands"],
+            "battery": self._battery_estimator.as_dict(),
+        }
+
+    @property
+    def initial_sync_active(self) -> bool:
+        """Return True while the retained message replay is being collected."""
+        return self._sync_pending_keys is not None
+
+    @callback
+    def _async_start_initial_sync(self) -> None:
+        """Start collecting updates until the retained message replay settles."""
+        self._sync_pending_keys = {}
+        self._sync_started = time.monotonic()
+        self._sync_duration = None
+        self._sync_end_reason = None
+        self._sync_device_list_seen = False
+        self._sync_commands_reported.clear()
+        self._sync_timeout_timer = async_call_later(
+            self.hass, INITIAL_SYNC_TIMEOUT, self._async_initial_sync_timeout
+        )
+        _LOGGER.debug("Initial sync started for remote %s", self.remote_id)
+
+    @callback
+    def _async_initial_sync_activity(self) -> None:
+        """Handle an update during the initial sync.
+        
+        Ends the sync once every device of the list has reported its
+        commands, otherwise restarts the quiet period.
+        """
+        if self._sync_device_list_seen:
+            # Only routed devices report commands (see lazy catalog)
+            expected = self._device_routes.names
+            if expected <= self._sync_commands_reported:
+                self._async_finish_initial_sync("all commands received")
+                return
+        
+        # The quiet period only runs once all subscriptions are in place
+        if self._sync_quiet_timer:
+            self._sync_quiet_timer()
+            self._async_arm_initial_sync_quiet_timer()
+
+    @callback
+    def _async_arm_initial_sync_quiet_timer(self) -> None:
+        """(Re)start the quiet period of the initial sync."""
+        self._sync_quiet_timer = async_call_later(
+            self.hass, INITIAL_SYNC_QUIET_PERIOD, self._async_initial_sync_quiet
+        )
+
+    @callback
+    def _async_initial_sync_quiet(self, _now=None) -> None:
+        """End the initial sync after a quiet period."""
+        self._sync_quiet_timer = None
+        self._async_finish_initial_sync("quiet period")
+
+    @callback
+    def _async_initial_sync_timeout(self, _now=None) -> None:
+        """End the initial sync when it takes too long."""
+        self._sync_timeout_timer = None
+        self._async_finish_initial_sync("timeout")
+
+    @callback
+    def _async_cancel_initial_sync_timers(self) -> None:
+        """Cancel the initial sync timers."""
+        if self._sync_quiet_timer:
+            self._sync_quiet_timer()
+            self._sync_quiet_timer = None
+        if self._sync_timeout_timer:
+            self._sync_timeout_timer()
+            self._sync_timeout_timer = None
+
+    @callback
+    def _async_finish_initial_sync(self, reason: str) -> None:
+        """Publish all updates collected during the initial sync at once."""
+        if self._sync_pending_keys is None:
+            return
+        
+        self._async_cancel_initial_sync_timers()
+        pending_keys = self._sync_pending_keys
+        self._sync_pending_keys = None
+        self._sync_duration = time.monotonic() - self._sync_started
+        self._sync_end_reason = reason
+        _LOGGER.info(
+            "Initial sync finished in %.2fs (%s) - publishing %d updated keys",
+            self._sync_duration, reason, len(pending_keys),
+        )
+        self._async_notify_keys(pending_keys)
+
     async def async_config_entry_first_refresh(self) -> None:
         """Perform first refresh and subscribe to MQTT topics."""
         # Subscribe to MQTT topics
@@ -99,100 +667,156 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
         """Subscribe to MQTT topics."""
         _LOGGER.debug("Subscribing to MQTT topics for remote %s", self.remote_id)
         
-        # Subscribe to status topic
-        await self._subscribe(
-            f"{self.base_topic}/{TOPIC_STATUS}",
-            self._handle_status
-        )
+        # Retained messages are replayed as soon as we subscribe
+        self._async_start_initial_sync()
         
-        # Subscribe to device list
-        await self._subscribe(
-            f"{self.base_topic}/{TOPIC_DEVICE_LIST}",
-            self._handle_device_list
-        )
+        # All remotes share one hub subscription; registering replays the
+        # state topics the hub already received for this remote
+        try:
+            await async_get_hub(self.hass).async_register(self)
+        except ConfigEntryNotReady:
+            self._async_cancel_initial_sync_timers()
+            self._sync_pending_keys = None
+            raise
+        self._hub_registered = True
         
-        # Subscribe to macro list
-        await self._subscribe(
-            f"{self.base_topic}/{TOPIC_MACRO_LIST}",
-            self._handle_macro_list
-        )
+        # Every topic is subscribed: the replay settles after a quiet period
+        if self.initial_sync_active:
+            self._async_arm_initial_sync_quiet_timer()
         
-        # Subscribe to battery level (receives value after publishing to battery/status)
-        await self._subscribe(
-            f"{self.base_topic}/{TOPIC_BATTERY_LEVEL}",
-            self._handle_battery
-        )
-        _LOGGER.info("Subscribed to battery_level topic")
+        # First battery request, spread across remotes by a stable offset
+        self._async_schedule_battery_refresh(battery_refresh_offset(self.remote_id))
+
+    @callback
+    def async_dispatch(self, subtopic: str, payload: str, received: float | None = None) -> None:
+        """Handle a message routed by the hub.
         
-        # Subscribe to key events
-        await self._subscribe(
-            f"{self.base_topic}/{TOPIC_KEYS}",
-            self._handle_keys
-        )
+        Args:
+            subtopic: Topic relative to base_topic (e.g. "device/TV/commands")
+            payload: Message payload
+            received: perf_counter() time the hub received the message
+        """
+        # Key presses drive latency-sensitive automations: no table lookup
+        # and no payload logging on this path
+        if subtopic == TOPIC_KEYS:
+            self._handle_keys(payload, received)
+            return
         
-        # Subscribe to test status (for running macro detection)
-        await self._subscribe(
-            f"{self.base_topic}/{TOPIC_TEST_STATUS}",
-            self._handle_test_status
-        )
+        _LOGGER.debug("MQTT received on '%s/%s': payload='%s' (len=%d)",
+                      self.base_topic, subtopic, payload[:100] if payload else "",
+                      len(payload) if payload else 0)
         
-        # Request initial battery level by publishing to battery/status
-        # This triggers the remote to publish the value on battery_level
-        battery_trigger_topic = f"{self.base_topic}/{TOPIC_BATTERY_STATUS}"
-        _LOGGER.info("Publishing to %s to trigger battery level update", battery_trigger_topic)
-        try:
-            _LOGGER.debug("MQTT PUBLISH: topic='%s', payload='', qos=0, retain=False", battery_trigger_topic)
-            await mqtt.async_publish(
-                self.hass,
-                battery_trigger_topic,
-                "",  # Empty payload to trigger update
-                qos=0,  # QoS 0 for monitoring requests (Haptique best practice)
-                retain=False
-            )
-            _LOGGER.info("SUCCESS: Battery level trigger published successfully")
-        except Exception as err:
-            _LOGGER.error("✗ Failed to publish battery trigger: %s", err)
-        
-        # Start periodic battery refresh timer
-        self._start_battery_refresh_timer()
+        handler = self._topic_handlers.get(subtopic)
+        if handler is not None:
+            handler(payload)
+        elif subtopic.startswith(self._command_router.prefix):
+            if subtopic.endswith(self._command_router.suffix):
+                self._command_router.async_route(subtopic, payload)
+        elif subtopic.startswith(self._macro_router.prefix):
+            if subtopic.endswith(self._macro_router.suffix):
+                self._macro_router.async_route(subtopic, payload)
 
-    async def _subscribe(self, topic: str, callback_func: callable, qos: int = 0, add_to_global: bool = True) -> callable:
-        """Subscribe to an MQTT topic.
+    @callback
+    def _is_duplicate_payload(self, topic: str, payload: str) -> bool:
+        """Return True if payload is identical to the last one seen on topic.
         
         Args:
-            topic: MQTT topic to subscribe to
-            callback_func: Function to call when message received
-            qos: Quality of Service (0 for monitoring, 1 for control commands)
-                 Default is 0 as per Haptique best practices for monitoring
-            add_to_global: If True, add to global subscriptions list for shutdown
-                          Set to False for subscriptions managed separately (e.g., macros)
+            topic: Topic relative to base_topic (e.g. "device/list")
+            payload: Raw payload string
+        """
+        fingerprint = (len(payload), hash(payload))
+        if self._payload_fingerprints.get(topic) == fingerprint:
+            self._duplicate_payloads_skipped += 1
+            _LOGGER.debug("Skipping unchanged payload on '%s'", topic)
+            return True
+        self._payload_fingerprints[topic] = fingerprint
+        return False
+
+    def _rebuild_device_index(self) -> None:
+        """Rebuild the device id <-> name indexes from the device list."""
+        self._device_names_by_id = {
+            d["id"]: d["name"] for d in self.data["devices"] if d.get("id") and d.get("name")
+        }
+        self._device_ids_by_name = {
+            name: device_id for device_id, name in self._device_names_by_id.items()
+        }
+
+    def _rebuild_macro_index(self) -> None:
+        """Rebuild the macro id <-> name indexes from the macro list."""
+        self._macro_names_by_id = {
+            m["id"]: m["name"] for m in self.data["macros"] if m.get("id") and m.get("name")
+        }
+        self._macro_ids_by_name = {
+            name: macro_id for macro_id, name in self._macro_names_by_id.items()
+        }
+
+    def _index_commands(self, device_name: str, commands: list[dict[str, Any]]) -> None:
+        """Index the command IDs of a device."""
+        self._command_ids_by_device[device_name] = frozenset(
+            cmd["id"] for cmd in commands if cmd.get("id")
+        )
+        self._commands_version += 1
+        self._commands_versions[device_name] = self._commands_version
+
+    def get_device_name(self, rs90_device_id: str) -> str | None:
+        """Return the name of a device from its stable RS90 ID."""
+        return self._device_names_by_id.get(rs90_device_id)
+
+    def get_device_id(self, device_name: str) -> str | None:
+        """Return the stable RS90 ID of a device from its name."""
+        return self._device_ids_by_name.get(device_name)
+
+    def get_macro_name(self, rs90_macro_id: str) -> str | None:
+        """Return the name of a macro from its stable RS90 ID."""
+        return self._macro_names_by_id.get(rs90_macro_id)
+
+    def get_macro_id(self, macro_name: str) -> str | None:
+        """Return the stable RS90 ID of a macro from its name."""
+        return self._macro_ids_by_name.get(macro_name)
+
+    def get_command_ids(self, device_name: str) -> frozenset[str]:
+        """Return the command IDs known for a device."""
+        return self._command_ids_by_device.get(device_name, frozenset())
+
+    def get_commands_version(self, device_name: str) -> int:
+        """Return the version of a device's command list (0 if unknown)."""
+        return self._commands_versions.get(device_name, 0)
+
+    @property
+    def catalog_etag(self) -> str:
+        """Return a tag that changes whenever a list or command list changes."""
+        return (
+            f"{self._catalog_epoch}-{self.devices_version}"
+            f"-{self.macros_version}-{self._commands_version}"
+        )
+
+    def get_catalog(self) -> dict[str, Any]:
+        """Return the devices (with their command IDs) and macros.
         
-        Returns:
-            Unsubscribe function
+        Devices whose commands are not known yet (lazy catalog) have
+        "commands" set to None.
         """
-        @callback
-        def message_received(msg):
-            """Handle new MQTT message."""
-            # msg.payload is already a string (decoded by Home Assistant)
-            payload_str = str(msg.payload)[:100] if msg.payload else ""
-            _LOGGER.debug("MQTT received on '%s': payload='%s' (len=%d)", 
-                         topic, payload_str, len(msg.payload) if msg.payload else 0)
-            callback_func(msg.payload)
-        
-        _LOGGER.debug("MQTT SUBSCRIBE: topic='%s', qos=%d", topic, qos)
-        _LOGGER.info("Attempting to subscribe to MQTT topic: %s (QoS %d)", topic, qos)
-        try:
-            unsubscribe = await mqtt.async_subscribe(
-                self.hass, topic, message_received, qos=qos
-            )
-            # Only add to global list if requested (avoid double-tracking)
-            if add_to_global:
-                self._subscriptions.append(unsubscribe)
-            _LOGGER.info("SUCCESS: Successfully subscribed to topic: %s (QoS %d)", topic, qos)
-            return unsubscribe
-        except Exception as err:
-            _LOGGER.error("✗ Failed to subscribe to topic %s: %s", topic, err)
-            return None
+        device_commands = self.data["device_commands"]
+        return {
+            "devices": [
+                {
+                    "id": device["id"],
+                    "name": device["name"],
+                    "commands": (
+                        [cmd["id"] for cmd in device_commands[device["name"]] if cmd.get("id")]
+                        if device["name"] in device_commands
+                        else None
+                    ),
+                }
+                for device in self.data["devices"]
+                if device.get("name")
+            ],
+            "macros": [
+                {"id": macro["id"], "name": macro["name"]}
+                for macro in self.data["macros"]
+                if macro.get("name")
+            ],
+        }
 
     @callback
     def _handle_status(self, payload: str) -> None:
@@ -200,16 +824,26 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
         status = payload.strip()
         old_status = self.data.get("status")
         
+        # Detail requests pause while offline and failed ones retry when back.
+        # Also on an unchanged status: a retained "offline" at startup matches
+        # the initial status but the fetcher starts unpaused.
+        self._detail_fetcher.async_set_online(status != STATE_OFFLINE)
+        
         if status != old_status:
             _LOGGER.info("Status changed: %s → %s", old_status, status)
             self.data["status"] = status
-            self.async_set_updated_data(self.data)
+            self.async_update_keys("status")
+            if status == STATE_ONLINE and self._battery_refresh_missed:
+                # Catch up on the battery request skipped while offline
+                self._async_schedule_battery_refresh(battery_refresh_offset(self.remote_id))
         else:
             _LOGGER.debug("Status unchanged: %s", status)
 
     @callback
     def _handle_device_list(self, payload: str) -> None:
         """Handle device list message and manage subscriptions."""
+        if self._is_duplicate_payload(TOPIC_DEVICE_LIST, payload):
+            return
         try:
             devices = json.loads(payload)
             _LOGGER.debug("Received device list: %s", devices)
@@ -228,39 +862,62 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
                 if device_name:
                     current_device_names.add(device_name)
             
+            devices_changed = normalized_devices != self.data["devices"]
+            if devices_changed:
+                self.devices_version += 1
             self.data["devices"] = normalized_devices
+            self._rebuild_device_index()
             _LOGGER.debug("Normalized devices: %s", normalized_devices)
             
-            # Detect new devices (not yet subscribed)
-            new_devices = current_device_names - self._subscribed_devices
+            # Route new devices, release removed ones and move renamed ones
+            new_devices, removed_devices, renamed_devices = self._device_routes.async_reconcile(
+                self._wanted_device_items()
+            )
             
-            # Detect removed devices (subscribed but not in current list)
-            removed_devices = self._subscribed_devices - current_device_names
+            # Renamed devices keep their commands, no new details request
+            self._async_migrate_device_commands(renamed_devices)
             
-            # Subscribe to new devices
+            # Request details of new devices, a few at a time
             for device_name in new_devices:
-                _LOGGER.info("NEW: New device detected: %s - subscribing to details", device_name)
-                asyncio.create_task(
-                    self._subscribe_device_details(device_name)
-                )
-                self._subscribed_devices.add(device_name)
+                _LOGGER.info("NEW: New device detected: %s - requesting details", device_name)
+                self._detail_fetcher.async_fetch(device_name)
             
-            # Clean up removed devices
-            for device_name in removed_devices:
+            # Clean up removed devices, and cached devices gone while offline
+            removed_devices = set(removed_devices) | (
+                set(self.data["device_commands"]) - current_device_names
+            )
+            for device_name in removed_devices - current_device_names:
                 _LOGGER.info("🗑️ Device removed: %s - cleaning up", device_name)
-                self._subscribed_devices.discard(device_name)
+                self._detail_fetcher.async_cancel(device_name)
+                # Forget the last commands payload so a re-added device is re-parsed
+                self._payload_fingerprints.pop(f"device/{device_name}/commands", None)
                 # Remove commands from storage
                 if device_name in self.data["device_commands"]:
                     del self.data["device_commands"][device_name]
                     _LOGGER.debug("Removed commands for deleted device: %s", device_name)
+                self._command_ids_by_device.pop(device_name, None)
+                if self._commands_versions.pop(device_name, None) is not None:
+                    self._commands_version += 1
             
-            self.async_set_updated_data(self.data)
+            self._async_compile_keymap()
+            self._async_schedule_cache_save()
+            
+            # Only now every device is routed: commands replayed while routing
+            # must not end the initial sync before the other devices report
+            self._sync_device_list_seen = True
+            self.async_update_keys(
+                *(("devices",) if devices_changed else ()),
+                *(("device_commands", device_name) for device_name in removed_devices),
+                *(("device_commands", name) for renamed in renamed_devices for name in renamed),
+            )
         except json.JSONDecodeError:
             _LOGGER.error("Failed to parse device list: %s", payload)
 
     @callback
     def _handle_macro_list(self, payload: str) -> None:
         """Handle macro list message and manage subscriptions."""
+        if self._is_duplicate_payload(TOPIC_MACRO_LIST, payload):
+            return
         try:
             macros = json.loads(payload)
             _LOGGER.debug("Received macro list: %s", macros)
@@ -279,48 +936,56 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
                 if macro_name:
                     current_macro_names.add(macro_name)
             
+            macros_changed = normalized_macros != self.data["macros"]
+            if macros_changed:
+                self.macros_version += 1
             self.data["macros"] = normalized_macros
+            self._rebuild_macro_index()
             _LOGGER.debug("Normalized macros: %s", normalized_macros)
             
-            # Detect new macros (not yet subscribed)
-            new_macros = current_macro_names - self._subscribed_macros
-            
-            # Detect removed macros (subscribed but not in current list)
-            removed_macros = self._subscribed_macros - current_macro_names
-            
-            _LOGGER.debug("Macro cleanup check - Current: %s, Subscribed: %s, To remove: %s", 
-                         current_macro_names, self._subscribed_macros, removed_macros)
-            
-            # Subscribe to new macros
+            # Route new macros, release removed ones and move renamed ones
+            new_macros, removed_macros, renamed_macros = self._macro_routes.async_reconcile(
+                _items_by_id(normalized_macros)
+            )
             for macro_name in new_macros:
-                _LOGGER.info("NEW: New macro detected: %s - subscribing to trigger", macro_name)
-                asyncio.create_task(
-                    self._subscribe_macro_trigger(macro_name)
-                )
-                # Note: macro_name will be added to _subscribed_macros inside _subscribe_macro_trigger()
+                _LOGGER.info("NEW: New macro detected: %s - routing trigger", macro_name)
+            
+            # Renamed macros keep their state
+            moved_states = {
+                old_name: self.data["macro_states"].pop(old_name)
+                for old_name, _ in renamed_macros
+                if old_name in self.data["macro_states"]
+            }
+            for old_name, new_name in renamed_macros:
+                _LOGGER.info("RENAME: Macro renamed: '%s' → '%s'", old_name, new_name)
+                if old_name in moved_states:
+                    self.data["macro_states"][new_name] = moved_states[old_name]
+            if renamed_macros:
+                # Keep the start order of the active macros
+                new_names = dict(renamed_macros)
+                self._active_macros = {
+                    new_names.get(name, name): started
+                    for name, started in self._active_macros.items()
+                }
             
             # Clean up removed macros
             for macro_name in removed_macros:
+                if macro_name in current_macro_names:
+                    continue
                 _LOGGER.info("🗑️ Macro removed: %s - cleaning up", macro_name)
-                self._subscribed_macros.discard(macro_name)
-                
-                # Unsubscribe from this macro's trigger topic
-                trigger_topic = f"{self.base_topic}/macro/{macro_name}/trigger"
-                _LOGGER.debug("Checking macro_subscriptions dict, keys: %s", list(self._macro_subscriptions.keys()))
-                if macro_name in self._macro_subscriptions:
-                    _LOGGER.debug("MQTT UNSUBSCRIBE: topic='%s'", trigger_topic)
-                    unsubscribe_func = self._macro_subscriptions.pop(macro_name)
-                    unsubscribe_func()
-                    _LOGGER.info("SUCCESS: Unsubscribed from macro trigger: %s", macro_name)
-                else:
-                    _LOGGER.warning("WARNING: Macro %s not found in subscriptions dict!", macro_name)
-                
                 # Remove state from memory
                 if macro_name in self.data["macro_states"]:
                     del self.data["macro_states"][macro_name]
                     _LOGGER.debug("Removed state for deleted macro: %s", macro_name)
+                self._active_macros.pop(macro_name, None)
             
-            self.async_set_updated_data(self.data)
+            self._async_compile_keymap()
+            self._async_schedule_cache_save()
+            self.async_update_keys(
+                *(("macros",) if macros_changed else ()),
+                *(("macro_states", macro_name) for macro_name in removed_macros),
+                *(("macro_states", name) for renamed in renamed_macros for name in renamed),
+            )
         except json.JSONDecodeError:
             _LOGGER.error("Failed to parse macro list: %s", payload)
 
@@ -354,15 +1019,24 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
                 battery_level = max(0, min(100, battery_level))
                 _LOGGER.info("Battery level updated: %d%%", battery_level)
                 self.data["battery_level"] = battery_level
-                self.async_set_updated_data(self.data)
+                self._record_battery_sample(battery_level)
+                self.async_update_keys("battery_level")
             else:
                 _LOGGER.warning("Could not parse battery level from: %s", payload)
         except (ValueError, TypeError) as err:
             _LOGGER.error("Failed to parse battery level: %s - %s", payload, err)
 
     @callback
-    def _handle_keys(self, payload: str) -> None:
-        """Handle key press events."""
+    def _handle_keys(self, payload: str, received: float | None = None) -> None:
+        """Handle key press events.
+        
+        The event is fired first, then only the last_key listeners are
+        notified, bypassing the initial sync and update coalescing.
+        
+        Args:
+            payload: Raw payload ("button:#")
+            received: time.perf_counter() when the message was received
+        """
         try:
             # Payload format: "button:#"
             if "button:" in payload:
@@ -371,25 +1045,118 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
                 
                 # Fire Home Assistant event for EVERY key press (including duplicates)
                 # This allows automations to trigger on repeated button presses
-                self.hass.bus.async_fire(
-                    f"{DOMAIN}_key_pressed",
-                    {
-                        "remote_id": self.remote_id,
-                        "device_id": self.device_id,  # HA device ID for device triggers
-                        "button": int(button_num),
-                        "timestamp": time.time(),  # Ensures uniqueness
-                    }
+                button = int(button_num)
+                event_data = {
+                    "remote_id": self.remote_id,
+                    "device_id": self.device_id,  # HA device ID for device triggers
+                    "button": button,
+                    "timestamp": time.time(),  # Ensures uniqueness
+                }
+                self.hass.bus.async_fire(EVENT_KEY_PRESSED, event_data)
+                
+                # Device triggers listen on a per-button signal (O(1) lookup)
+                async_dispatcher_send(
+                    self.hass,
+                    SIGNAL_BUTTON_PRESSED.format(device_id=self.device_id, button=button),
+                    event_data,
                 )
+                if received is not None:
+                    self._record_key_latency(time.perf_counter() - received)
+                
+                # Local keymap: publish the mapped action directly
+                action = self._keymap_actions.get(button)
+                if action is not None:
+                    self._async_run_keymap_action(*action)
                 _LOGGER.debug("Fired event: %s_key_pressed with button %s", DOMAIN, button_num)
                 
                 # Update sensor state (for backward compatibility)
                 self.data["last_key"] = button_num
-                self.async_set_updated_data(self.data)
+                self._async_notify_last_key()
             else:
                 _LOGGER.warning("Unexpected key payload format: %s", payload)
         except (IndexError, AttributeError) as err:
             _LOGGER.error("Failed to parse key event: %s - %s", payload, err)
 
+    @callback
+    def _async_notify_last_key(self) -> None:
+        """Notify the last_key listeners, rate limited in recorder-friendly mode."""
+        if not self._recorder_friendly:
+            self._async_notify_keys(("last_key",))
+            return
+        
+        if self._last_key_trailing is not None:
+            # The pending trailing notification will carry this key
+            self._last_key_writes_suppressed += 1
+            return
+        
+        wait = self._last_key_notified + LAST_KEY_MIN_WRITE_INTERVAL - time.monotonic()
+        if wait > 0:
+            self._last_key_trailing = async_call_later(
+                self.hass, wait, self._async_flush_last_key
+            )
+            return
+        
+        self._last_key_notified = time.monotonic()
+        self._async_notify_keys(("last_key",))
+
+    @callback
+    def _async_flush_last_key(self, _now=None) -> None:
+        """Send the trailing last_key notification."""
+        self._last_key_trailing = None
+        self._last_key_notified = time.monotonic()
+        self._async_notify_keys(("last_key",))
+
+    @callback
+    def _async_compile_keymap(self) -> None:
+        """Precompute the MQTT action of each keymap button.
+        
+        Targets given as stable IDs are resolved to the current names, so
+        this runs again whenever the device or macro list changes.
+        """
+        device_names = self._device_names_by_id
+        macro_names = self._macro_names_by_id
+        
+        actions: dict[int, tuple[str, str, str, str]] = {}
+        for button, (kind, target, payload) in self._keymap.items():
+            if kind == KEYMAP_DEVICE:
+                name = device_names.get(target) or target
+                actions[button] = (kind, name, f"{self.base_topic}/device/{name}/trigger", payload)
+            else:
+                name = macro_names.get(target) or target
+                actions[button] = (kind, name, f"{self.base_topic}/macro/{name}/trigger", payload)
+        self._keymap_actions = actions
+
+    @callback
+    def _async_run_keymap_action(self, kind: str, name: str, topic: str, payload: str) -> None:
+        """Publish a keymap action."""
+        self._keymap_actions_run += 1
+        if kind == KEYMAP_DEVICE:
+            # Device commands go through the paced queue like service calls
+            self.hass.async_create_task(self._async_send_keymap_command(name, topic, payload))
+            return
+        
+        # Macro state is persistent: publish with retain like async_trigger_macro
+        _LOGGER.debug("MQTT PUBLISH (KEYMAP): topic='%s', payload='%s', qos=1, retain=True", topic, payload)
+        self.hass.async_create_task(
+            mqtt.async_publish(self.hass, topic, payload, qos=1, retain=True)
+        )
+        # Update local state immediately (will be confirmed by MQTT callback)
+        self._async_set_macro_state(name, payload)
+
+    async def _async_send_keymap_command(self, device_name: str, topic: str, payload: str) -> None:
+        """Send a keymap device command through the command queue."""
+        try:
+            await self._command_queue.async_send(device_name, topic, payload)
+        except Exception as err:
+            _LOGGER.error("✗ Failed to send keymap command %s to %s: %s", payload, device_name, err)
+
+    def _record_key_latency(self, latency: float) -> None:
+        """Record the time from MQTT receive to key event fire."""
+        self._key_latency_count += 1
+        self._key_latency_total += latency
+        self._key_latency_last = latency
+        self._key_latency_max = max(self._key_latency_max, latency)
+
     @callback
     def _handle_test_status(self, payload: str) -> None:
         """Handle test status message (running macro info)."""
@@ -403,19 +1170,63 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
         else:
             self.data["running_macro"] = None
             
-        self.async_set_updated_data(self.data)
+        self.async_update_keys("test_status", "running_macro")
+
+    def _wanted_device_items(self) -> dict[str, str]:
+        """Return id -> name of the devices whose commands are fetched."""
+        items = _items_by_id(self.data["devices"])
+        if not self._lazy_catalog:
+            return items
+        wanted = self._wanted_devices | self._prefetch_devices
+        return {
+            item_id: name
+            for item_id, name in items.items()
+            if item_id in wanted or name in wanted
+        }
+
+    @callback
+    def async_want_device(self, device_name: str) -> asyncio.Task | None:
+        """Route a device and fetch its commands if not known yet.
+        
+        In lazy catalog mode this loads the catalog of a device on first
+        use. Retained commands of devices not routed yet are not kept, so
+        the commands are requested from the RS90.
+        
+        Returns:
+            The fetch task, or None if the commands are already known
+        """
+        if device_name not in self._device_routes.names:
+            self._wanted_devices.add(self.get_device_id(device_name) or device_name)
+            new_devices, _, _ = self._device_routes.async_reconcile(self._wanted_device_items())
+            if new_devices:
+                _LOGGER.info("Loading command catalog on demand: %s", new_devices)
+        if device_name not in self._device_routes.names:
+            return None  # Not in the device list
+        if device_name in self.data["device_commands"]:
+            return None
+        return self._detail_fetcher.async_fetch(device_name)
+
+    async def async_ensure_device_commands(self, device_name: str) -> list[dict[str, Any]]:
+        """Return the commands of a device, fetching them first if needed."""
+        if (task := self.async_want_device(device_name)) is not None:
+            await asyncio.gather(task, return_exceptions=True)
+        return self.data["device_commands"].get(device_name, [])
 
-    async def _subscribe_device_details(self, device_name: str) -> None:
-        """Subscribe to device commands topic and request details.
+    async def _async_request_device_details(self, device_name: str) -> None:
+        """Request the commands of a device.
         
         According to actual RS90 behavior:
         1. Publish empty payload to device/{name}/detail to request commands
-        2. Subscribe to device/{name}/commands to receive the command list
+        2. The remote answers on device/{name}/commands with the command list
         
         Note: This differs from Haptique documentation which suggests
         subscribing to /detail directly. See bug report for details.
+        
+        The /commands topic is received through the shared hub subscription;
+        the route is added (see SubscriptionManager) before the request so
+        the answer (or an earlier retained payload) is handled right away.
         """
-        # Step 1: Request device details by publishing empty payload to /detail
+        # Request device details by publishing empty payload to /detail
         detail_topic = f"{self.base_topic}/device/{device_name}/detail"
         _LOGGER.info("Requesting device details for '%s' via topic: %s", device_name, detail_topic)
         _LOGGER.debug("MQTT PUBLISH (REQUEST DETAILS): topic='%s', payload='', qos=0, retain=False", detail_topic)
@@ -431,78 +1242,102 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
             _LOGGER.info("SUCCESS: Device details request published for: %s", device_name)
         except Exception as err:
             _LOGGER.error("✗ Failed to publish device details request for %s: %s", device_name, err)
+
+    @callback
+    def _handle_device_commands(self, device_name: str, payload: str) -> None:
+        """Handle device commands message."""
+        self._detail_fetcher.async_answered(device_name)
+        if self.initial_sync_active:
+            self._sync_commands_reported.add(device_name)
+        if self._is_duplicate_payload(f"device/{device_name}/commands", payload or ""):
             return
+        _LOGGER.debug("Received payload on /commands for device '%s': %s", device_name, payload[:200] if payload else "None")
         
-        # Step 2: Subscribe to /commands topic to receive the command list
-        commands_topic = f"{self.base_topic}/device/{device_name}/commands"
+        # FIX v1.2.8: Handle empty payloads properly (device removed or no commands)
+        if not payload or payload.strip() == "":
+            _LOGGER.debug("Received empty payload for device '%s' - clearing commands", device_name)
+            self.data["device_commands"][device_name] = []
+            self._index_commands(device_name, [])
+            self._async_schedule_cache_save()
+            self.async_update_keys(("device_commands", device_name))
+            return
         
-        @callback
-        def handle_device_commands(payload: str) -> None:
-            """Handle device commands message."""
-            _LOGGER.debug("Received payload on /commands for device '%s': %s", device_name, payload[:200] if payload else "None")
-            
-            # FIX v1.2.8: Handle empty payloads properly (device removed or no commands)
-            if not payload or payload.strip() == "":
-                _LOGGER.debug("Received empty payload for device '%s' - clearing commands", device_name)
-                self.data["device_commands"][device_name] = []
-                self.async_set_updated_data(self.data)
-                return
+        try:
+            commands = json.loads(payload)
+            _LOGGER.info("SUCCESS: Received %d commands for device '%s'", len(commands), device_name)
             
-            try:
-                commands = json.loads(payload)
-                _LOGGER.info("SUCCESS: Received %d commands for device '%s'", len(commands), device_name)
-                
-                # Normalize ID field (handle both "id", "Id", "ID")
-                normalized_commands = []
-                for command in commands:
-                    cmd_id = command.get("id") or command.get("Id") or command.get("ID")
-                    normalized_command = {
-                        "id": cmd_id,
-                        "name": command.get("name")
-                    }
-                    normalized_commands.append(normalized_command)
-                    _LOGGER.debug("Normalized command: id=%s, name=%s", normalized_command.get("id"), normalized_command.get("name"))
-                
-                self.data["device_commands"][device_name] = normalized_commands
-                _LOGGER.info("SUCCESS: Stored %d normalized commands for '%s'", len(normalized_commands), device_name)
-                _LOGGER.debug("Current device_commands keys: %s", list(self.data["device_commands"].keys()))
-                self.async_set_updated_data(self.data)
-            except json.JSONDecodeError as err:
-                _LOGGER.error("Failed to parse device commands for %s: %s - Error: %s", device_name, payload, err)
-        
-        # Subscribe to /commands topic (where RS90 actually publishes the retained message)
-        await self._subscribe(commands_topic, handle_device_commands)
-        _LOGGER.info("SUCCESS: Subscribed to retained commands topic: %s", commands_topic)
-
-    async def _subscribe_macro_trigger(self, macro_name: str) -> None:
-        """Subscribe to macro trigger topic for state tracking."""
-        topic = f"{self.base_topic}/macro/{macro_name}/trigger"
-        
-        @callback
-        def handle_macro_trigger(payload: str) -> None:
-            """Handle macro trigger state."""
-            state = payload.strip().lower()
-            _LOGGER.debug("Macro %s trigger state received: %s", macro_name, state)
+            # Normalize ID field (handle both "id", "Id", "ID")
+            normalized_commands = []
+            for command in commands:
+                cmd_id = command.get("id") or command.get("Id") or command.get("ID")
+                normalized_command = {
+                    "id": cmd_id,
+                    "name": command.get("name")
+                }
+                normalized_commands.append(normalized_command)
+                _LOGGER.debug("Normalized command: id=%s, name=%s", normalized_command.get("id"), normalized_command.get("name"))
             
-            # Store the macro state in memory only
-            if state in ["on", "off"]:
-                self.data["macro_states"][macro_name] = state
-                _LOGGER.info("SUCCESS: Macro '%s' state updated to: %s", macro_name, state)
-                self.async_set_updated_data(self.data)
-            else:
-                _LOGGER.warning("Invalid macro state '%s' for macro '%s', expected 'on' or 'off'", state, macro_name)
+            self.data["device_commands"][device_name] = normalized_commands
+            self._index_commands(device_name, normalized_commands)
+            _LOGGER.info("SUCCESS: Stored %d normalized commands for '%s'", len(normalized_commands), device_name)
+            _LOGGER.debug("Current device_commands keys: %s", list(self.data["device_commands"].keys()))
+            self._async_schedule_cache_save()
+            self.async_update_keys(("device_commands", device_name))
+        except json.JSONDecodeError as err:
+            _LOGGER.error("Failed to parse device commands for %s: %s - Error: %s", device_name, payload, err)
+
+    @callback
+    def _async_migrate_device_commands(self, renamed: list[tuple[str, str]]) -> None:
+        """Move the cached commands of renamed devices to their new name.
         
-        # FIX v1.2.8: Use QoS 0 for monitoring (subscribe), QoS 1 only for control (publish)
-        # Don't add to global subscriptions as we track macros separately
-        unsubscribe = await self._subscribe(topic, handle_macro_trigger, qos=0, add_to_global=False)
+        Commands already received under the new name (a retained payload
+        replayed when the route moved) are newer and are kept instead.
+        """
+        moved = {
+            old_name: (
+                self.data["device_commands"].pop(old_name, None),
+                self._payload_fingerprints.pop(f"device/{old_name}/commands", None),
+                self._command_ids_by_device.pop(old_name, None),
+                self._commands_versions.pop(old_name, None),
+            )
+            for old_name, _ in renamed
+        }
+        for old_name, new_name in renamed:
+            # The old name is gone for good: drop its fetch state
+            self._detail_fetcher.async_cancel(old_name)
+            if new_name in self.data["device_commands"]:
+                _LOGGER.info(
+                    "RENAME: Device renamed: '%s' → '%s' - commands already received", old_name, new_name
+                )
+                continue
+            _LOGGER.info("RENAME: Device renamed: '%s' → '%s' - keeping commands", old_name, new_name)
+            commands, fingerprint, command_ids, version = moved[old_name]
+            if commands is not None:
+                self.data["device_commands"][new_name] = commands
+            if fingerprint is not None:
+                self._payload_fingerprints[f"device/{new_name}/commands"] = fingerprint
+            if command_ids is not None:
+                self._command_ids_by_device[new_name] = command_ids
+            if version is not None:
+                self._commands_versions[new_name] = version
+            if old_name in self._sync_commands_reported:
+                self._sync_commands_reported.add(new_name)
+            if commands is None:
+                # Still waiting for the commands: ask under the new name
+                self._detail_fetcher.async_fetch(new_name)
+
+    @callback
+    def _handle_macro_trigger(self, macro_name: str, payload: str) -> None:
+        """Handle macro trigger state."""
+        state = payload.strip().lower()
+        _LOGGER.debug("Macro %s trigger state received: %s", macro_name, state)
         
-        # Only add to tracking if subscription succeeded
-        if unsubscribe:
-            self._macro_subscriptions[macro_name] = unsubscribe
-            self._subscribed_macros.add(macro_name)  # Add AFTER successful subscription
-            _LOGGER.info("SUCCESS: Subscribed to macro trigger: %s", topic)
+        # Store the macro state in memory only
+        if state in ["on", "off"]:
+            self._async_set_macro_state(macro_name, state)
+            _LOGGER.info("SUCCESS: Macro '%s' state updated to: %s", macro_name, state)
         else:
-            _LOGGER.error("Failed to subscribe to macro trigger: %s", topic)
+            _LOGGER.warning("Invalid macro state '%s' for macro '%s', expected 'on' or 'off'", state, macro_name)
 
     async def async_trigger_macro(self, macro_name: str, action: str = "on") -> None:
         """Trigger a macro with ON or OFF action."""
@@ -514,13 +1349,95 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
         await mqtt.async_publish(self.hass, topic, action, qos=1, retain=True)
         
         # Update local state immediately (will be confirmed by MQTT callback)
-        self.data["macro_states"][macro_name] = action
-        self.async_set_updated_data(self.data)
+        self._async_set_macro_state(macro_name, action)
+
+    @callback
+    def _async_set_macro_state(self, macro_name: str, state: str) -> None:
+        """Store a macro state and keep the active macros in start order."""
+        self.data["macro_states"][macro_name] = state
+        if state == "on":
+            # The MQTT echo of our own trigger keeps the first start time
+            if macro_name not in self._active_macros:
+                self._active_macros[macro_name] = dt_util.utcnow()
+        else:
+            self._active_macros.pop(macro_name, None)
+        self.async_update_keys(("macro_states", macro_name))
+
+    @property
+    def active_macros(self) -> dict[str, datetime]:
+        """Return the macros currently on -> start time, oldest first."""
+        return self._active_macros
+
+    @property
+    def last_started_macro(self) -> str | None:
+        """Return the most recently started macro still on."""
+        return next(reversed(self._active_macros), None)
 
-    async def async_trigger_device_command(self, device_name: str, command_name: str) -> None:
-        """Trigger a device command."""
+    async def async_trigger_device_command(self, device_name: str, command_name: str) -> dict[str, float]:
+        """Trigger a device command.
+        
+        The command goes through the device's paced queue, so bursts are
+        spaced by the minimum command gap instead of being dropped by the RS90.
+        
+        Returns:
+            Timing of the command (queue wait and publish duration in seconds)
+        """
         topic = f"{self.base_topic}/device/{device_name}/trigger"
         _LOGGER.debug("Triggering command %s for device %s", command_name, device_name)
+        return await self._command_queue.async_send(device_name, topic, command_name)
+
+    async def async_send_command_sequence(
+        self, device_name: str, steps: list[tuple[str, float]]
+    ) -> dict[str, Any]:
+        """Send an ordered sequence of commands to a device.
+        
+        All steps are queued at once and streamed by the device's command
+        queue, which keeps their order and spaces them by the minimum gap
+        (or the step's own delay, if longer).
+        
+        Args:
+            device_name: Device to send the commands to
+            steps: Ordered (command, delay_after in seconds) pairs
+        
+        Returns:
+            Per-command timing (queue wait and publish duration in ms)
+        """
+        topic = f"{self.base_topic}/device/{device_name}/trigger"
+        known_commands = self.get_command_ids(device_name)
+        unknown = {command for command, _ in steps if known_commands and command not in known_commands}
+        if unknown:
+            _LOGGER.warning("Unknown commands for device %s: %s", device_name, unknown)
+        
+        _LOGGER.debug("Sending sequence of %d commands to device %s", len(steps), device_name)
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *(
+                self._command_queue.async_send(device_name, topic, command, delay_after)
+                for command, delay_after in steps
+            ),
+            return_exceptions=True,
+        )
+        
+        commands = []
+        for (command, _), result in zip(steps, results):
+            if isinstance(result, BaseException):
+                commands.append({"command": command, "error": str(result) or type(result).__name__})
+            else:
+                commands.append({
+                    "command": command,
+                    "queue_wait_ms": round(result["queue_wait"] * 1000, 1),
+                    "publish_ms": round(result["publish"] * 1000, 1),
+                })
+        
+        return {
+            "device_name": device_name,
+            "sent": sum(1 for command in commands if "error" not in command),
+            "total_ms": round((time.monotonic() - started) * 1000, 1),
+            "commands": commands,
+        }
+
+    async def _async_publish_device_command(self, topic: str, command_name: str) -> None:
+        """Publish a device command (called by the command queue)."""
         _LOGGER.debug("MQTT PUBLISH (DEVICE): topic='%s', payload='%s', qos=1, retain=False", topic, command_name)
         await mqtt.async_publish(self.hass, topic, command_name, qos=1, retain=False)
 
@@ -559,10 +1476,9 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
                 _LOGGER.debug("LED light duration expired, updating local state to OFF")
                 self.data["led_light_state"] = "off"
                 self.data["led_light_duration"] = 0
-                self.async_set_updated_data(self.data)
+                self.async_update_keys("led_light_state", "led_light_duration")
                 self._led_light_timer = None
             
-            from homeassistant.helpers.event import async_call_later
             self._led_light_timer = async_call_later(
                 self.hass,
                 duration,
@@ -575,12 +1491,28 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
         # Update local state
         self.data["led_light_state"] = state
         self.data["led_light_duration"] = duration if state == "on" else 0
-        self.async_set_updated_data(self.data)
+        self.async_update_keys("led_light_state", "led_light_duration")
 
     async def async_shutdown(self) -> None:
         """Unsubscribe from all MQTT topics and cancel timers."""
         _LOGGER.debug("Shutting down coordinator for remote %s", self.remote_id)
         
+        # Cancel pending device commands
+        await self._command_queue.async_shutdown()
+        
+        # Cancel running device detail fetches
+        self._detail_fetcher.async_shutdown()
+        
+        # Cancel initial sync timers and pending coalesced notification
+        self._async_cancel_initial_sync_timers()
+        if self._coalescing_flush:
+            self._coalescing_flush()
+            self._coalescing_flush = None
+        self._coalesced_keys.clear()
+        if self._last_key_trailing:
+            self._last_key_trailing()
+            self._last_key_trailing = None
+        
         # Cancel battery refresh timer
         if self._battery_refresh_timer:
             self._battery_refresh_timer()
@@ -593,49 +1525,88 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
             self._led_light_timer = None
             _LOGGER.debug("Cancelled LED light timer")
         
-        # Unsubscribe from all global topics
-        for unsubscribe in self._subscriptions:
-            unsubscribe()
-        self._subscriptions.clear()
+        # Stop receiving messages from the shared hub subscription
+        if self._hub_registered:
+            async_get_hub(self.hass).async_unregister(self)
+            self._hub_registered = False
         
-        # Unsubscribe from all macro-specific topics
-        for macro_name, unsubscribe in self._macro_subscriptions.items():
-            unsubscribe()
-            _LOGGER.debug("Unsubscribed from macro: %s", macro_name)
-        self._macro_subscriptions.clear()
+        # Release all device command and macro trigger routes
+        self._device_routes.async_clear()
+        self._macro_routes.async_clear()
 
-    def _start_battery_refresh_timer(self) -> None:
-        """Start periodic battery level refresh timer.
+    def _record_battery_sample(self, level: int) -> None:
+        """Feed a battery level to the drain estimator and reschedule."""
+        if self._battery_estimator.add_sample(time.time(), level):
+            self._async_schedule_cache_save()
+        
+        # Reschedule from this answer, with the updated interval
+        if self._battery_refresh_timer:
+            self._async_schedule_battery_refresh(self._next_battery_refresh_interval())
+
+    @property
+    def battery_drain_rate(self) -> float | None:
+        """Return the estimated battery drain in percent per hour."""
+        return self._battery_estimator.drain_rate
+
+    @property
+    def battery_hours_remaining(self) -> float | None:
+        """Return the estimated hours until the battery is empty."""
+        return self._battery_estimator.hours_remaining
+
+    def _next_battery_refresh_interval(self) -> float:
+        """Return the delay until the next battery request, in seconds."""
+        return battery_refresh_interval(
+            self.data["battery_level"],
+            self._battery_estimator.drain_rate,
+            self._battery_estimator.charging,
+        )
+
+    @callback
+    def _async_schedule_battery_refresh(self, delay: float) -> None:
+        """(Re)schedule the next battery request."""
+        if self._battery_refresh_timer:
+            self._battery_refresh_timer()
+        self._battery_refresh_interval = delay
+        self._battery_refresh_next = dt_util.utcnow() + timedelta(seconds=delay)
+        self._battery_refresh_timer = async_call_later(
+            self.hass, delay, self._async_battery_refresh
+        )
+        _LOGGER.debug("Next battery refresh in %.0f seconds", delay)
+
+    @callback
+    def _async_battery_refresh(self, _now=None) -> None:
+        """Request the battery level, unless the remote is offline.
         
         The RS90 doesn't automatically push battery updates, so we need to
         periodically request them by publishing to battery/status topic.
         """
-        async def _refresh_battery(_now=None):
-            """Request battery level update."""
-            battery_trigger_topic = f"{self.base_topic}/{TOPIC_BATTERY_STATUS}"
-            _LOGGER.debug("Periodic battery refresh - publishing to %s", battery_trigger_topic)
-            try:
-                await mqtt.async_publish(
-                    self.hass,
-                    battery_trigger_topic,
-                    "",
-                    qos=0,
-                    retain=False
-                )
-                _LOGGER.debug("SUCCESS: Battery refresh request sent")
-            except Exception as err:
-                _LOGGER.error("✗ Failed to send battery refresh request: %s", err)
-        
-        from homeassistant.helpers.event import async_track_time_interval
-        from datetime import timedelta
-        
-        # Schedule periodic refresh - async_track_time_interval handles thread safety
-        self._battery_refresh_timer = async_track_time_interval(
-            self.hass,
-            _refresh_battery,  # Pass async function directly
-            timedelta(seconds=self._battery_refresh_interval)
-        )
-        _LOGGER.info("Started battery refresh timer (interval: %d seconds)", self._battery_refresh_interval)
+        self._battery_refresh_timer = None
+        self._async_schedule_battery_refresh(self._next_battery_refresh_interval())
+        
+        if self.data.get("status") != STATE_ONLINE:
+            self._battery_refresh_skipped += 1
+            self._battery_refresh_missed = True
+            _LOGGER.debug("Remote %s offline - skipping battery refresh", self.remote_id)
+            return
+        
+        self._battery_refresh_missed = False
+        self.hass.async_create_task(self._async_request_battery_level())
+
+    async def _async_request_battery_level(self) -> None:
+        """Publish to battery/status so the remote publishes battery_level."""
+        battery_trigger_topic = f"{self.base_topic}/{TOPIC_BATTERY_STATUS}"
+        _LOGGER.debug("MQTT PUBLISH: topic='%s', payload='', qos=0, retain=False", battery_trigger_topic)
+        try:
+            await mqtt.async_publish(
+                self.hass,
+                battery_trigger_topic,
+                "",  # Empty payload to trigger update
+                qos=0,  # QoS 0 for monitoring requests (Haptique best practice)
+                retain=False
+            )
+            _LOGGER.debug("SUCCESS: Battery refresh request sent")
+        except Exception as err:
+            _LOGGER.error("✗ Failed to send battery refresh request: %s", err)
 
     async def async_force_refresh_lists(self) -> None:
         """Force refresh of device and macro lists by re-processing current data.
@@ -651,54 +1622,44 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
         _LOGGER.warning("Force refresh lists requested")
         
         # Request battery level update
-        battery_trigger_topic = f"{self.base_topic}/{TOPIC_BATTERY_STATUS}"
         _LOGGER.info("Requesting battery level update...")
-        try:
-            await mqtt.async_publish(
-                self.hass,
-                battery_trigger_topic,
-                "",
-                qos=0,
-                retain=False
-            )
-            _LOGGER.debug("Battery refresh request sent to %s", battery_trigger_topic)
-        except Exception as err:
-            _LOGGER.error("Failed to request battery update: %s", err)
+        await self._async_request_battery_level()
         
         # Re-process current device list
         if self.data.get("devices"):
             _LOGGER.info("Re-processing device list to detect new devices...")
-            current_device_names = {device.get("name") for device in self.data["devices"] if device.get("name")}
-            new_devices = current_device_names - self._subscribed_devices
+            new_devices, _, _ = self._device_routes.async_reconcile(
+                self._wanted_device_items()
+            )
             
             if new_devices:
-                _LOGGER.info("NEW: Found %d new unsubscribed devices: %s", len(new_devices), new_devices)
-                for device_name in new_devices:
-                    _LOGGER.info("Subscribing to commands for: %s", device_name)
-                    await self._subscribe_device_details(device_name)
-                    self._subscribed_devices.add(device_name)
+                _LOGGER.info("NEW: Found %d new unrouted devices: %s", len(new_devices), new_devices)
             else:
                 _LOGGER.info("No new devices to subscribe to")
+            
+            # Fetch new devices and retry the ones that never answered
+            failed_devices = self._detail_fetcher.failed_devices
+            if failed_devices:
+                _LOGGER.info("Retrying details of %d failed devices: %s", len(failed_devices), failed_devices)
+            await self._detail_fetcher.async_fetch_all([*new_devices, *failed_devices])
         
         # Re-process current macro list
         if self.data.get("macros"):
             _LOGGER.info("Re-processing macro list to detect new macros...")
-            current_macro_names = {macro.get("name") for macro in self.data["macros"] if macro.get("name")}
-            new_macros = current_macro_names - self._subscribed_macros
+            new_macros, _, _ = self._macro_routes.async_reconcile(
+                _items_by_id(self.data["macros"])
+            )
             
             if new_macros:
-                _LOGGER.info("NEW: Found %d new unsubscribed macros: %s", len(new_macros), new_macros)
-                for macro_name in new_macros:
-                    _LOGGER.info("Subscribing to trigger for: %s", macro_name)
-                    await self._subscribe_macro_trigger(macro_name)
+                _LOGGER.info("NEW: Routed %d new macros: %s", len(new_macros), new_macros)
             else:
                 _LOGGER.info("No new macros to subscribe to")
         
         # Log current state
         _LOGGER.info("Current devices: %s", [d.get("name") for d in self.data.get("devices", [])])
-        _LOGGER.info("Subscribed devices: %s", self._subscribed_devices)
+        _LOGGER.info("Routed devices: %s", self._device_routes.names)
         _LOGGER.info("Current macros: %s", [m.get("name") for m in self.data.get("macros", [])])
-        _LOGGER.info("Subscribed macros: %s", self._subscribed_macros)
+        _LOGGER.info("Routed macros: %s", self._macro_routes.names)
 
     def get_diagnostics(self) -> dict:
         """Get diagnostic information."""
@@ -718,9 +1679,56 @@ class HaptiqueRS90Coordinator(DataUpdateCoordinator):
             "devices": self.data.get("devices", []),
             "macros_count": len(self.data.get("macros", [])),
             "macros": self.data.get("macros", []),
+            "devices_version": self.devices_version,
+            "macros_version": self.macros_version,
+            "catalog_etag": self.catalog_etag,
+            "active_macros": {
+                name: started.isoformat() for name, started in self._active_macros.items()
+            },
+            "recorder_friendly": {
+                "enabled": self._recorder_friendly,
+                "last_key_writes_suppressed": self._last_key_writes_suppressed,
+            },
             "device_commands": device_commands_detail,
             "device_commands_keys": list(self.data.get("device_commands", {}).keys()),
-            "subscriptions_count": len(self._subscriptions),
-            "subscribed_devices": list(self._subscribed_devices),
+            "hub": async_get_hub(self.hass).get_diagnostics(),
+            "duplicate_payloads_skipped": self._duplicate_payloads_skipped,
+            "initial_sync_seconds": round(self._sync_duration, 3) if self._sync_duration is not None else None,
+            "initial_sync_end_reason": self._sync_end_reason,
+            "update_coalescing": self._coalescing_mode,
+            "coalesced_updates": self._coalesced_updates,
+            "keymap": {button: action[2] for button, action in self._keymap_actions.items()},
+            "command_queue": self._command_queue.get_stats(),
+            "detail_fetch": self._detail_fetcher.get_stats(),
+            "lazy_catalog": {
+                "enabled": self._lazy_catalog,
+                "prefetch_devices": sorted(self._prefetch_devices),
+                "loaded_devices": len(self._device_routes),
+                "total_devices": len(self.data["devices"]),
+            },
+            "keymap_actions_run": self._keymap_actions_run,
+            "key_event_latency": {
+                "count": self._key_latency_count,
+                "last_ms": round(self._key_latency_last * 1000, 3) if self._key_latency_last is not None else None,
+                "avg_ms": round(self._key_latency_total / self._key_latency_count * 1000, 3) if self._key_latency_count else None,
+                "max_ms": round(self._key_latency_max * 1000, 3),
+            },
+            "battery_refresh": {
+                "next_refresh": self._battery_refresh_next.isoformat() if self._battery_refresh_timer else None,
+                "interval_s": round(self._battery_refresh_interval) if self._battery_refresh_interval is not None else None,
+                "drain_rate_per_hour": round(self.battery_drain_rate, 3) if self.battery_drain_rate is not None else None,
+                "charging": self._battery_estimator.charging,
+                "samples": len(self._battery_estimator),
+                "skipped_offline": self._battery_refresh_skipped,
+            },
+            "device_command_routes": len(self._command_router),
+            "macro_trigger_routes": len(self._macro_router),
+            "subscribed_devices": sorted(self._device_routes.names),
+            "subscriptions": {
+                "devices": len(self._device_routes),
+                "macros": len(self._macro_routes),
+                "released": self._device_routes.released + self._macro_routes.released,
+                "renames_migrated": self._device_routes.migrated + self._macro_routes.migrated,
+            },
         }
 
@@ -0,0 +1,258 @@
+"""Device detail fetch pipeline for Haptique RS90 Remote integration.
+
+The RS90 answers a request on device/<name>/detail with the command list on
+device/<name>/commands. Requests are made with bounded concurrency: a fetch
+holds one slot from the request until the answer arrives (or its deadline
+passes), so a large catalog is fetched in parallel without bursting the
+remote.
+
+Unanswered requests are retried with exponential backoff. While the remote
+is offline no request is made, and devices that failed are fetched again
+when it comes back online, so the catalog converges without a manual
+refresh.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from functools import partial
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+DETAIL_PENDING = "pending"
+DETAIL_OK = "ok"
+DETAIL_FAILED = "failed"
+
+
+class _DetailRequest:
+    """Sync state of one device."""
+
+    def __init__(self) -> None:
+        """Initialize the request state."""
+        self.state = DETAIL_PENDING
+        self.attempts = 0
+        self.sent_at: float | None = None  # monotonic() of the last request
+        self.deadline: float | None = None  # monotonic() the answer is due
+        self.rtt: float | None = None  # Last request -> answer time
+        self.next_retry: float | None = None  # monotonic() of the next attempt
+
+
+class DetailFetcher:
+    """Track device detail requests with deadlines, backoff and retries."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        request: Callable[[str], Awaitable[None]],
+        limit: int,
+        timeout: float,
+        retries: int,
+        backoff: float,
+        backoff_max: float,
+    ) -> None:
+        """Initialize the fetcher.
+
+        Args:
+            hass: Home Assistant instance
+            request: Coroutine function publishing the detail request of a device
+            limit: Maximum number of outstanding requests
+            timeout: Time to wait for the commands answer, in seconds
+            retries: Extra attempts after a timeout
+            backoff: Delay before the first retry, doubled for each retry
+            backoff_max: Upper bound of the retry delay
+        """
+        self.hass = hass
+        self._request = request
+        self.limit = limit
+        self._timeout = timeout
+        self._retries = retries
+        self._backoff = backoff
+        self._backoff_max = backoff_max
+        self._semaphore = asyncio.Semaphore(limit)
+        self._online = asyncio.Event()
+        self._online.set()  # Until the remote reports offline
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._waiters: dict[str, asyncio.Future] = {}
+        self._requests: dict[str, _DetailRequest] = {}
+        # Answers of devices not tracked yet (retained payloads replayed
+        # before the fetch), consumed by the next async_fetch
+        self._answered_early: set[str] = set()
+        self.requested = 0
+        self.answered = 0
+        self.timeouts = 0
+        self.failed = 0
+
+    @callback
+    def async_fetch(self, device_name: str) -> asyncio.Task:
+        """Fetch the commands of a device, unless a fetch is already running.
+
+        Returns:
+            The tracked fetch task
+        """
+        if (task := self._tasks.get(device_name)) is not None:
+            return task
+        # Keep the attempts of an earlier failed fetch
+        request = self._requests.setdefault(device_name, _DetailRequest())
+        if device_name in self._answered_early:
+            # Already answered: the task returns without a request
+            self._answered_early.discard(device_name)
+            request.state = DETAIL_OK
+        else:
+            request.state = DETAIL_PENDING
+        task = self.hass.async_create_background_task(
+            self._async_fetch(device_name), f"haptique_rs90 detail {device_name}"
+        )
+        self._tasks[device_name] = task
+        task.add_done_callback(partial(self._async_fetch_done, device_name))
+        return task
+
+    @callback
+    def _async_fetch_done(self, device_name: str, task: asyncio.Task) -> None:
+        """Forget a finished fetch, unless it was already replaced."""
+        if self._tasks.get(device_name) is task:
+            del self._tasks[device_name]
+
+    async def async_fetch_all(self, device_names: Iterable[str]) -> None:
+        """Fetch several devices and wait until all of them are done."""
+        tasks = [self.async_fetch(device_name) for device_name in device_names]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _async_fetch(self, device_name: str) -> bool:
+        """Request the details of a device until it answers."""
+        request = self._requests[device_name]
+        for attempt in range(1 + self._retries):
+            if attempt:
+                delay = min(self._backoff * 2 ** (attempt - 1), self._backoff_max)
+                request.next_retry = time.monotonic() + delay
+                await asyncio.sleep(delay)
+                request.next_retry = None
+
+            # No point asking a sleeping remote: wait until it is back
+            await self._online.wait()
+            if request.state == DETAIL_OK:
+                return True  # Answered while waiting
+
+            async with self._semaphore:
+                if request.state == DETAIL_OK:
+                    return True  # Answered while waiting for a slot
+
+                future: asyncio.Future = self.hass.loop.create_future()
+                self._waiters[device_name] = future
+                try:
+                    self.requested += 1
+                    request.attempts += 1
+                    request.sent_at = time.monotonic()
+                    request.deadline = request.sent_at + self._timeout
+                    await self._request(device_name)
+                    async with asyncio.timeout(self._timeout):
+                        await future
+                    return True
+                except TimeoutError:
+                    self.timeouts += 1
+                    _LOGGER.debug(
+                        "No commands from '%s' after %.1fs (attempt %d)",
+                        device_name, self._timeout, request.attempts,
+                    )
+                finally:
+                    request.deadline = None
+                    self._waiters.pop(device_name, None)
+
+        self.failed += 1
+        request.state = DETAIL_FAILED
+        _LOGGER.warning(
+            "✗ No commands received for device '%s' after %d attempts - retrying when online",
+            device_name, request.attempts,
+        )
+        return False
+
+    @callback
+    def async_answered(self, device_name: str) -> None:
+        """Handle a commands payload of a device."""
+        request = self._requests.get(device_name)
+        if request is None:
+            self._answered_early.add(device_name)
+            return
+        request.state = DETAIL_OK
+        request.next_retry = None
+
+        future = self._waiters.get(device_name)
+        if future is None:
+            return  # Not requested yet (or a republish): the fetch sees the state
+        if not future.done():
+            self.answered += 1
+            if request is not None and request.sent_at is not None:
+                request.rtt = time.monotonic() - request.sent_at
+            future.set_result(None)
+
+    @property
+    def failed_devices(self) -> list[str]:
+        """Return the devices whose last fetch got no answer."""
+        return [
+            device_name
+            for device_name, request in self._requests.items()
+            if request.state == DETAIL_FAILED
+        ]
+
+    @callback
+    def async_set_online(self, online: bool) -> None:
+        """Pause requests while the remote is offline, retry failures when back."""
+        if not online:
+            self._online.clear()
+            return
+
+        was_offline = not self._online.is_set()
+        self._online.set()
+        if not was_offline:
+            return
+        failed = self.failed_devices
+        if failed:
+            _LOGGER.info("Remote back online - retrying details of %d devices", len(failed))
+        for device_name in failed:
+            self.async_fetch(device_name)
+
+    @callback
+    def async_cancel(self, device_name: str) -> None:
+        """Stop fetching a removed or renamed device."""
+        self._answered_early.discard(device_name)
+        self._requests.pop(device_name, None)
+        if (task := self._tasks.pop(device_name, None)) is not None:
+            task.cancel()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel every running fetch."""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        self._waiters.clear()
+        self._answered_early.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Return pipeline counters and the sync state of each device."""
+        now = time.monotonic()
+        return {
+            "limit": self.limit,
+            "running": len(self._tasks),
+            "in_flight": len(self._waiters),
+            "paused_offline": not self._online.is_set(),
+            "requested": self.requested,
+            "answered": self.answered,
+            "timeouts": self.timeouts,
+            "failed": self.failed,
+            "devices": {
+                device_name: {
+                    "state": request.state,
+                    "attempts": request.attempts,
+                    "rtt_ms": round(request.rtt * 1000, 1) if request.rtt is not None else None,
+                    "deadline_in_s": round(request.deadline - now, 1) if request.deadline is not None else None,
+                    "next_retry_in_s": round(request.next_retry - now, 1) if request.next_retry is not None else None,
+                }
+                for device_name, request in self._requests.items()
+            },
+        }
@@ -7,13 +7,13 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant.components.device_automation import DEVICE_TRIGGER_BASE_SCHEMA
-from homeassistant.components.homeassistant.triggers import event as event_trigger
 from homeassistant.const import CONF_DEVICE_ID, CONF_DOMAIN, CONF_PLATFORM, CONF_TYPE
-from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, Event, HassJob, HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
+from .const import DOMAIN, EVENT_KEY_PRESSED, SIGNAL_BUTTON_PRESSED
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -74,23 +74,39 @@ async def async_attach_trigger(
     action: Any,
     trigger_info: dict[str, Any],
 ) -> CALLBACK_TYPE:
-    """Attach a trigger."""
+    """Attach a trigger.
+    
+    Listens on the per-button dispatcher signal sent by the coordinator, so
+    a key press only runs the automations bound to that exact button
+    instead of matching every attached trigger against each key event.
+    """
     device_id = config[CONF_DEVICE_ID]
     button = config["button"]
+    trigger_data = trigger_info["trigger_data"]
+    job = HassJob(action, f"{DOMAIN} device trigger {trigger_info}")
     
-    event_config = event_trigger.TRIGGER_SCHEMA(
-        {
-            event_trigger.CONF_PLATFORM: "event",
-            event_trigger.CONF_EVENT_TYPE: f"{DOMAIN}_key_pressed",
-            event_trigger.CONF_EVENT_DATA: {
-                "device_id": device_id,
-                "button": button,
+    @callback
+    def button_pressed(event_data: dict[str, Any]) -> None:
+        """Run the automation action for a button press."""
+        # Same trigger variables as the event trigger (trigger.event.data...)
+        event = Event(EVENT_KEY_PRESSED, event_data)
+        hass.async_run_hass_job(
+            job,
+            {
+                "trigger": {
+                    **trigger_data,
+                    "platform": "device",
+                    "event": event,
+                    "description": f"event '{EVENT_KEY_PRESSED}'",
+                }
             },
-        }
-    )
+            event.context,
+        )
     
-    return await event_trigger.async_attach_trigger(
-        hass, event_config, action, trigger_info, platform_type="device"
+    return async_dispatcher_connect(
+        hass,
+        SIGNAL_BUTTON_PRESSED.format(device_id=device_id, button=button),
+        button_pressed,
     )
 
 
@@ -0,0 +1,53 @@
+"""Base entity for Haptique RS90 Remote integration."""
+from __future__ import annotations
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import DataKey, HaptiqueRS90Coordinator
+
+
+class HaptiqueRS90Entity(CoordinatorEntity):
+    """Coordinator entity woken only by the data keys it reads.
+
+    MQTT handlers notify per data key (see async_update_keys), so a battery
+    update only wakes the battery sensor instead of every entity.
+    """
+
+    coordinator: HaptiqueRS90Coordinator
+
+    def __init__(self, coordinator: HaptiqueRS90Coordinator) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._key_unsubscribes: list[CALLBACK_TYPE] = []
+
+    @property
+    def data_keys(self) -> tuple[DataKey, ...]:
+        """Return the coordinator data keys this entity reads."""
+        return ()
+
+    async def async_added_to_hass(self) -> None:
+        """Register key listeners when added to hass."""
+        await super().async_added_to_hass()
+        self._async_subscribe_data_keys()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Remove key listeners when removed from hass."""
+        self._async_unsubscribe_data_keys()
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _async_subscribe_data_keys(self) -> None:
+        """(Re)register key listeners, e.g. after a rename changed the keys."""
+        self._async_unsubscribe_data_keys()
+        self._key_unsubscribes = [
+            self.coordinator.async_add_key_listener(key, self._handle_coordinator_update)
+            for key in self.data_keys
+        ]
+
+    @callback
+    def _async_unsubscribe_data_keys(self) -> None:
+        """Remove all key listeners."""
+        for unsubscribe in self._key_unsubscribes:
+            unsubscribe()
+        self._key_unsubscribes = []
@@ -0,0 +1,158 @@
+"""Shared MQTT dispatcher for Haptique RS90 Remote integration.
+
+All config entries share a single `Haptique/#` subscription. Each message is
+split into remote id and sub-topic and handed to the coordinator of that
+remote in O(1); the coordinator holds the per-remote handler table.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components import mqtt
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+
+from .const import (
+    DOMAIN,
+    DATA_HUB,
+    TOPIC_BASE,
+    TOPIC_STATUS,
+    TOPIC_DEVICE_LIST,
+    TOPIC_MACRO_LIST,
+)
+
+if TYPE_CHECKING:
+    from .coordinator import HaptiqueRS90Coordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _is_state_topic(subtopic: str) -> bool:
+    """Return True for the retained state topics published by the RS90."""
+    if subtopic in (TOPIC_STATUS, TOPIC_DEVICE_LIST, TOPIC_MACRO_LIST):
+        return True
+    # Device commands are not cached: they are the bulk of the retained
+    # traffic, and a late coordinator requests the ones it needs
+    if subtopic.startswith("macro/"):
+        return subtopic.endswith("/trigger")
+    return False
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> HaptiqueRS90Hub:
+    """Return the shared hub, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (hub := domain_data.get(DATA_HUB)) is None:
+        hub = domain_data[DATA_HUB] = HaptiqueRS90Hub(hass)
+    return hub
+
+
+class HaptiqueRS90Hub:
+    """Single MQTT subscription and dispatcher for all RS90 remotes."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self._prefix = f"{TOPIC_BASE}/"
+        self._coordinators: dict[str, HaptiqueRS90Coordinator] = {}
+        self._unsubscribe: CALLBACK_TYPE | None = None
+        # Entries set up concurrently must not both subscribe
+        self._subscribe_lock = asyncio.Lock()
+
+        # Latest payload of each state topic per remote. The broker only
+        # replays retained messages on subscribe, so remotes registering
+        # after the shared subscription (or reloaded) are replayed from here.
+        self._state_cache: dict[str, dict[str, str]] = {}
+
+        # Remotes publishing without a config entry: remote id -> messages seen
+        self.unconfigured_remotes: dict[str, int] = {}
+        self.messages_received = 0
+
+    async def async_register(self, coordinator: HaptiqueRS90Coordinator) -> None:
+        """Route the messages of a remote to its coordinator.
+
+        Raises:
+            ConfigEntryNotReady: The shared subscription could not be made
+        """
+        remote_id = coordinator.remote_id
+        self._coordinators[remote_id] = coordinator
+        self.unconfigured_remotes.pop(remote_id, None)
+
+        async with self._subscribe_lock:
+            if self._unsubscribe is None:
+                topic = f"{TOPIC_BASE}/#"
+                _LOGGER.debug("MQTT SUBSCRIBE: topic='%s', qos=0", topic)
+                try:
+                    self._unsubscribe = await mqtt.async_subscribe(
+                        self.hass, topic, self._async_message_received, qos=0
+                    )
+                except Exception as err:
+                    _LOGGER.error("✗ Failed to subscribe to topic %s: %s", topic, err)
+                    self.async_unregister(coordinator)
+                    raise ConfigEntryNotReady(f"Failed to subscribe to {topic}: {err}") from err
+                _LOGGER.info("SUCCESS: Hub subscribed to topic: %s", topic)
+                return
+
+        # Shared subscription already active: replay the known state
+        cached = self._state_cache.get(remote_id, {})
+        _LOGGER.debug("Replaying %d cached state topics for remote %s", len(cached), remote_id)
+        for subtopic, payload in list(cached.items()):
+            coordinator.async_dispatch(subtopic, payload)
+
+    @callback
+    def async_unregister(self, coordinator: HaptiqueRS90Coordinator) -> None:
+        """Stop routing messages to a coordinator."""
+        if self._coordinators.get(coordinator.remote_id) is coordinator:
+            del self._coordinators[coordinator.remote_id]
+
+        if not self._coordinators and self._unsubscribe is not None:
+            _LOGGER.debug("No remote left - hub unsubscribing from %s/#", TOPIC_BASE)
+            self._unsubscribe()
+            self._unsubscribe = None
+            self._state_cache.clear()
+
+    @callback
+    def _async_message_received(self, msg: Any) -> None:
+        """Dispatch a message to the coordinator of its remote."""
+        received = time.perf_counter()
+        self.messages_received += 1
+        remote_id, _, subtopic = msg.topic[len(self._prefix):].partition("/")
+        payload = msg.payload
+
+        if _is_state_topic(subtopic):
+            if payload:
+                self._state_cache.setdefault(remote_id, {})[subtopic] = payload
+            else:
+                self._state_cache.get(remote_id, {}).pop(subtopic, None)
+
+        coordinator = self._coordinators.get(remote_id)
+        if coordinator is None:
+            self.unconfigured_remotes[remote_id] = self.unconfigured_remotes.get(remote_id, 0) + 1
+            return
+
+        coordinator.async_dispatch(subtopic, payload, received)
+
+    def get_status_remote_ids(self) -> set[str]:
+        """Return the remote ids with a cached status payload."""
+        return {
+            remote_id
+            for remote_id, topics in self._state_cache.items()
+            if TOPIC_STATUS in topics
+        }
+
+    def get_cached_status(self, remote_id: str) -> str | None:
+        """Return the last status payload seen for a remote."""
+        return self._state_cache.get(remote_id, {}).get(TOPIC_STATUS)
+
+    def get_diagnostics(self) -> dict[str, Any]:
+        """Return hub diagnostic information."""
+        return {
+            "subscribed": self._unsubscribe is not None,
+            "registered_remotes": list(self._coordinators),
+            "unconfigured_remotes": dict(self.unconfigured_remotes),
+            "messages_received": self.messages_received,
+            "cached_state_topics": sum(len(topics) for topics in self._state_cache.values()),
+        }
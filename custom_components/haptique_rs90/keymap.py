@@ -0,0 +1,70 @@
+"""Local keymap for Haptique RS90 Remote integration.
+
+A keymap maps RS90 buttons directly to a device command or a macro, so the
+coordinator can publish the action itself when the key is pressed, without
+going through the event bus, an automation and a service call.
+
+Keymap option format, one mapping per line::
+
+    7 = device:AVR:volume_up
+    12 = macro:Watch TV:on
+
+The target is a device/macro name or its stable RS90 ID. The macro action
+defaults to "on". Empty lines and lines starting with "#" are ignored.
+"""
+from __future__ import annotations
+
+KEYMAP_DEVICE = "device"
+KEYMAP_MACRO = "macro"
+
+MIN_BUTTON = 1
+MAX_BUTTON = 24  # RS90 has 24 physical buttons
+
+
+class KeymapError(ValueError):
+    """Error raised for an invalid keymap line."""
+
+
+def parse_keymap(text: str | None) -> dict[int, tuple[str, str, str]]:
+    """Parse keymap option text.
+
+    Returns:
+        Mapping of button number to (kind, target, payload)
+
+    Raises:
+        KeymapError: If a line is invalid
+    """
+    keymap: dict[int, tuple[str, str, str]] = {}
+    for line_number, line in enumerate((text or "").splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        button_str, separator, action = line.partition("=")
+        if not separator:
+            raise KeymapError(f"Line {line_number}: expected '<button> = <action>'")
+
+        try:
+            button = int(button_str.strip())
+        except ValueError as err:
+            raise KeymapError(f"Line {line_number}: invalid button '{button_str.strip()}'") from err
+        if not MIN_BUTTON <= button <= MAX_BUTTON:
+            raise KeymapError(f"Line {line_number}: button must be {MIN_BUTTON}-{MAX_BUTTON}")
+        if button in keymap:
+            raise KeymapError(f"Line {line_number}: button {button} is mapped twice")
+
+        parts = [part.strip() for part in action.split(":")]
+        kind = parts[0].lower()
+        if kind == KEYMAP_DEVICE and len(parts) == 3 and parts[1] and parts[2]:
+            keymap[button] = (KEYMAP_DEVICE, parts[1], parts[2])
+        elif kind == KEYMAP_MACRO and len(parts) in (2, 3) and parts[1]:
+            macro_action = parts[2].lower() if len(parts) == 3 else "on"
+            if macro_action not in ("on", "off"):
+                raise KeymapError(f"Line {line_number}: macro action must be 'on' or 'off'")
+            keymap[button] = (KEYMAP_MACRO, parts[1], macro_action)
+        else:
+            raise KeymapError(
+                f"Line {line_number}: expected 'device:<device>:<command>' or 'macro:<macro>[:on|off]'"
+            )
+
+    return keymap
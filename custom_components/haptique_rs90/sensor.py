@@ -10,15 +10,16 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE
+from homeassistant.const import PERCENTAGE, UnitOfTime
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, CONF_REMOTE_ID
-from .coordinator import HaptiqueRS90Coordinator
+from .const import DOMAIN, CONF_REMOTE_ID, CONF_COMMAND_ATTRIBUTES, CONF_RECORDER_FRIENDLY
+from .coordinator import DataKey, HaptiqueRS90Coordinator
+from .entity import HaptiqueRS90Entity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,12 +34,23 @@ async def async_setup_entry(
     entity_registry = er.async_get(hass)
     remote_id = entry.data[CONF_REMOTE_ID]
     
+    # Recorder-friendly mode: variants whose bulky attributes are not recorded
+    if entry.options.get(CONF_RECORDER_FRIENDLY, False):
+        summary_class = RecorderFriendlyInfoSummarySensor
+        running_macro_class = RecorderFriendlyRunningMacroSensor
+        commands_class = RecorderFriendlyDeviceCommandsSensor
+    else:
+        summary_class = RS90InfoSummarySensor
+        running_macro_class = HaptiqueRS90RunningMacroSensor
+        commands_class = HaptiqueRS90DeviceCommandsSensor
+    
     # Base sensors (always present)
     entities = [
-        RS90InfoSummarySensor(coordinator, entry),  # First for visibility
+        summary_class(coordinator, entry),  # First for visibility
         HaptiqueRS90BatterySensor(coordinator, entry),
+        HaptiqueRS90BatteryTimeRemainingSensor(coordinator, entry),
         HaptiqueRS90LastKeySensor(coordinator, entry),
-        HaptiqueRS90RunningMacroSensor(coordinator, entry),
+        running_macro_class(coordinator, entry),
     ]
     
     # Track device command sensors by device ID
@@ -55,16 +67,21 @@ async def async_setup_entry(
         if not device_id or not device_name:
             continue
         
-        sensor = HaptiqueRS90DeviceCommandsSensor(coordinator, entry, device_name)
+        sensor = commands_class(coordinator, entry, device_name)
         device_sensors[device_id] = sensor
         entities.append(sensor)
         _LOGGER.debug("Setup commands sensor for device: %s (id: %s)", device_name, device_id)
     
     async_add_entities(entities)
+    reconciled_version = coordinator.devices_version
     
     @callback
     def manage_device_sensors() -> None:
         """Add new device sensors and remove obsolete ones."""
+        nonlocal reconciled_version
+        if coordinator.devices_version == reconciled_version:
+            return  # Device list unchanged
+        reconciled_version = coordinator.devices_version
         _LOGGER.debug("=== SENSOR: Entity update triggered ===")
         entity_registry = er.async_get(hass)
         
@@ -88,8 +105,9 @@ async def async_setup_entry(
                 old_name = sensor._device_name
                 _LOGGER.info("RENAME: Device renamed: '%s' → '%s' (id: %s)", 
                             old_name, new_name, device_id)
-                # Update sensor's internal name
+                # Update sensor's internal name and the commands slice it listens to
                 sensor._device_name = new_name
+                sensor._async_subscribe_data_keys()
                 # Update friendly name in entity registry
                 entity_reg = er.async_get(hass)
                 if entity_entry := entity_reg.async_get(sensor.entity_id):
@@ -112,7 +130,7 @@ async def async_setup_entry(
             device_id = device.get("id")
             device_name = device.get("name")
             if device_id in devices_to_add and device_name:
-                sensor = HaptiqueRS90DeviceCommandsSensor(coordinator, entry, device_name)
+                sensor = commands_class(coordinator, entry, device_name)
                 device_sensors[device_id] = sensor  # Use device_id as key, not name
                 new_entities.append(sensor)
                 _LOGGER.info("SUCCESS: Adding commands sensor for new device: %s (id: %s)", device_name, device_id)
@@ -148,11 +166,11 @@ async def async_setup_entry(
             else:
                 _LOGGER.warning("Could not find sensor for device_id: %s", device_id)
     
-    # Register listener for coordinator updates
-    entry.async_on_unload(coordinator.async_add_listener(manage_device_sensors))
+    # Register listener for device list updates only
+    entry.async_on_unload(coordinator.async_add_key_listener("devices", manage_device_sensors))
 
 
-class HaptiqueRS90SensorBase(CoordinatorEntity, SensorEntity):
+class HaptiqueRS90SensorBase(HaptiqueRS90Entity, SensorEntity):
     """Base class for Haptique RS90 sensors."""
 
     def __init__(
@@ -197,6 +215,11 @@ class HaptiqueRS90BatterySensor(HaptiqueRS90SensorBase):
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_icon = "mdi:battery"
 
+    @property
+    def data_keys(self) -> tuple[DataKey, ...]:
+        """Return the coordinator data keys this sensor reads."""
+        return ("battery_level",)
+
     @property
     def native_value(self) -> int | None:
         """Return the battery level."""
@@ -229,6 +252,45 @@ class HaptiqueRS90BatterySensor(HaptiqueRS90SensorBase):
         return "mdi:battery"
 
 
+class HaptiqueRS90BatteryTimeRemainingSensor(HaptiqueRS90SensorBase):
+    """Estimated battery time remaining sensor for Haptique RS90."""
+
+    def __init__(
+        self,
+        coordinator: HaptiqueRS90Coordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the battery time remaining sensor."""
+        super().__init__(coordinator, entry, "battery_time_remaining")
+        self._attr_name = "Battery Time Remaining"
+        self._attr_device_class = SensorDeviceClass.DURATION
+        self._attr_native_unit_of_measurement = UnitOfTime.HOURS
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_suggested_display_precision = 0
+        self._attr_icon = "mdi:battery-clock"
+
+    @property
+    def data_keys(self) -> tuple[DataKey, ...]:
+        """Return the coordinator data keys this sensor reads."""
+        return ("battery_level",)
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the estimated hours until the battery is empty."""
+        hours_remaining = self.coordinator.battery_hours_remaining
+        if hours_remaining is None:
+            return None
+        return round(hours_remaining, 1)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the estimated drain rate."""
+        drain_rate = self.coordinator.battery_drain_rate
+        return {
+            "drain_rate": round(drain_rate, 3) if drain_rate is not None else None,
+        }
+
+
 class HaptiqueRS90LastKeySensor(HaptiqueRS90SensorBase):
     """Last key pressed sensor for Haptique RS90."""
 
@@ -242,6 +304,11 @@ class HaptiqueRS90LastKeySensor(HaptiqueRS90SensorBase):
         self._attr_name = "Last Key Pressed"
         self._attr_icon = "mdi:gesture-tap-button"
 
+    @property
+    def data_keys(self) -> tuple[DataKey, ...]:
+        """Return the coordinator data keys this sensor reads."""
+        return ("last_key",)
+
     @property
     def native_value(self) -> str | None:
         """Return the last key pressed."""
@@ -272,30 +339,38 @@ class HaptiqueRS90RunningMacroSensor(HaptiqueRS90SensorBase):
         self._attr_name = "Running Macro"
         self._attr_icon = "mdi:play-circle"
 
+    @property
+    def data_keys(self) -> tuple[DataKey, ...]:
+        """Return the coordinator data keys this sensor reads."""
+        return ("macro_states",)
+
     @property
     def native_value(self) -> str | None:
-        """Return the running macro name or Idle."""
-        # Get the macro that has status "on"
-        macro_states = self.coordinator.data.get("macro_states", {})
-        for macro_name, state in macro_states.items():
-            if state == "on":
-                return macro_name
-        return "Idle"
+        """Return the most recently started macro or Idle."""
+        return self.coordinator.last_started_macro or "Idle"
 
     @property
     def icon(self) -> str:
         """Return icon based on state."""
-        if self.native_value and self.native_value != "Idle":
+        if self.coordinator.last_started_macro is not None:
             return "mdi:play-circle"  # Icône play quand actif (sera coloré par HA)
         return "mdi:circle-outline"  # Icône vide quand idle
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional attributes."""
-        macro_states = self.coordinator.data.get("macro_states", {})
+        active_macros = self.coordinator.active_macros
+        now = dt_util.utcnow()
         return {
-            "macro_states": macro_states,
-            "active_macros": [name for name, state in macro_states.items() if state == "on"],
+            "macro_states": self.coordinator.data.get("macro_states", {}),
+            "active_macros": list(active_macros),  # Oldest first
+            "started_at": {
+                name: started.isoformat() for name, started in active_macros.items()
+            },
+            "running_seconds": {
+                name: round((now - started).total_seconds())
+                for name, started in active_macros.items()
+            },
         }
 
 
@@ -339,21 +414,58 @@ class HaptiqueRS90DeviceCommandsSensor(HaptiqueRS90SensorBase):
         self._attr_icon = "mdi:remote"
         # Catégorie diagnostic pour grouper séparément dans l'interface
         self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        
+        # command_1..command_N attributes (the catalog is also served by the
+        # haptique_rs90/catalog websocket command)
+        self._command_attributes: bool = entry.options.get(CONF_COMMAND_ATTRIBUTES, True)
+        
+        # Attributes memoized per commands version (see _attributes_version)
+        self._attributes: tuple[tuple[Any, ...], dict[str, Any]] | None = None
+        self._written_version: tuple[Any, ...] | None = None
 
     @property
     def name(self) -> str:
         """Return the friendly name (updates on rename)."""
         return f"Commands - {self._device_name}"
 
+    @property
+    def data_keys(self) -> tuple[DataKey, ...]:
+        """Return the coordinator data keys this sensor reads."""
+        return (("device_commands", self._device_name),)
+
     @property
     def native_value(self) -> int:
         """Return the number of commands for this device."""
         commands = self.coordinator.data.get("device_commands", {}).get(self._device_name, [])
         return len(commands)
 
+    def _attributes_version(self) -> tuple[Any, ...]:
+        """Return what the attributes depend on."""
+        return (
+            self._device_name,
+            self._device_id,
+            self.coordinator.get_commands_version(self._device_name),
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only when the commands changed."""
+        version = self._attributes_version()
+        if version == self._written_version:
+            return
+        self._written_version = version
+        super()._handle_coordinator_update()
+
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return command IDs as attributes."""
+        version = self._attributes_version()
+        if self._attributes is None or self._attributes[0] != version:
+            self._attributes = (version, self._build_attributes())
+        return self._attributes[1]
+
+    def _build_attributes(self) -> dict[str, Any]:
+        """Build the command attributes."""
         commands = self.coordinator.data.get("device_commands", {}).get(self._device_name, [])
         command_ids = [cmd.get("id") for cmd in commands if cmd.get("id")]
         
@@ -365,8 +477,9 @@ class HaptiqueRS90DeviceCommandsSensor(HaptiqueRS90SensorBase):
         }
         
         # Add each command as a separate attribute for easy access
-        for idx, cmd_id in enumerate(command_ids, 1):
-            attributes[f"command_{idx}"] = cmd_id
+        if self._command_attributes:
+            for idx, cmd_id in enumerate(command_ids, 1):
+                attributes[f"command_{idx}"] = cmd_id
         
         return attributes
 
@@ -385,6 +498,16 @@ class RS90InfoSummarySensor(HaptiqueRS90SensorBase):
         
         self._attr_name = "Info Summary"
         self._attr_icon = "mdi:information-variant"
+        
+        # Attributes memoized per list versions (see _attributes_version)
+        self._attributes: tuple[tuple[Any, ...], dict[str, Any]] | None = None
+        self._written_version: tuple[Any, ...] | None = None
+        self._ha_device_id: str | None = None
+    
+    @property
+    def data_keys(self) -> tuple[DataKey, ...]:
+        """Return the coordinator data keys this sensor reads."""
+        return ("devices", "macros")
     
     @property
     def native_value(self) -> str:
@@ -393,18 +516,51 @@ class RS90InfoSummarySensor(HaptiqueRS90SensorBase):
         macros_count = len(self.coordinator.data.get("macros", []))
         return f"{devices_count} devices, {macros_count} macros"
     
+    def _attributes_version(self) -> tuple[Any, ...]:
+        """Return what the attributes depend on."""
+        return (
+            self.coordinator.devices_version,
+            self.coordinator.macros_version,
+            self._entry.data.get("name"),
+            self._ha_device_id,
+        )
+    
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only when the device or macro list changed."""
+        version = self._attributes_version()
+        if version == self._written_version:
+            return
+        self._written_version = version
+        super()._handle_coordinator_update()
+    
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return all RS90 configuration information as attributes."""
+        version = self._attributes_version()
+        if (
+            self._attributes is None
+            or self._attributes[0] != version
+            or self._ha_device_id is None  # Not registered yet: look up again
+        ):
+            self._attributes = (version, self._build_attributes())
+        return self._attributes[1]
+    
+    def _build_attributes(self) -> dict[str, Any]:
+        """Build the configuration attributes."""
         from homeassistant.helpers import device_registry as dr
         
-        # Get RS90 device info from Home Assistant device registry
-        device_registry = dr.async_get(self.hass)
-        rs90_device = device_registry.async_get_device(
-            identifiers={(DOMAIN, self._entry.data["remote_id"])}
-        )
+        # Get RS90 device info from Home Assistant device registry (once found,
+        # the HA device ID does not change)
+        if self._ha_device_id is None:
+            device_registry = dr.async_get(self.hass)
+            rs90_device = device_registry.async_get_device(
+                identifiers={(DOMAIN, self._entry.data["remote_id"])}
+            )
+            if rs90_device:
+                self._ha_device_id = rs90_device.id
         
-        ha_device_id = rs90_device.id if rs90_device else "N/A"
+        ha_device_id = self._ha_device_id or "N/A"
         
         # Build devices dictionary with name as key, id as value
         devices = self.coordinator.data.get("devices", [])
@@ -438,3 +594,34 @@ class RS90InfoSummarySensor(HaptiqueRS90SensorBase):
             "rs90_device_name": device_name,
         }
 
+
+class RecorderFriendlyRunningMacroSensor(HaptiqueRS90RunningMacroSensor):
+    """Running macro sensor whose macro_states attribute is not recorded."""
+
+    _unrecorded_attributes = frozenset({"macro_states"})
+
+
+class RecorderFriendlyDeviceCommandsSensor(HaptiqueRS90DeviceCommandsSensor):
+    """Device commands sensor whose command list is not recorded.
+    
+    The command_N attribute names depend on the device, so they cannot be
+    excluded from the recorder: they are dropped instead.
+    """
+
+    _unrecorded_attributes = frozenset({"commands"})
+
+    def __init__(
+        self,
+        coordinator: HaptiqueRS90Coordinator,
+        entry: ConfigEntry,
+        device_name: str,
+    ) -> None:
+        """Initialize the device commands sensor."""
+        super().__init__(coordinator, entry, device_name)
+        self._command_attributes = False
+
+
+class RecorderFriendlyInfoSummarySensor(RS90InfoSummarySensor):
+    """Info summary sensor whose device and macro maps are not recorded."""
+
+    _unrecorded_attributes = frozenset({"devices", "macros"})
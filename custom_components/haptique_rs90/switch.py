@@ -9,10 +9,10 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, CONF_REMOTE_ID
-from .coordinator import HaptiqueRS90Coordinator
+from .coordinator import DataKey, HaptiqueRS90Coordinator
+from .entity import HaptiqueRS90Entity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,10 +36,15 @@ async def async_setup_entry(
             entities[macro_id] = entity
     
     async_add_entities(entities.values())
+    reconciled_version = coordinator.macros_version
     
     @callback
     def _async_update_entities() -> None:
         """Add new entities and remove obsolete ones when macros change."""
+        nonlocal reconciled_version
+        if coordinator.macros_version == reconciled_version:
+            return  # Macro list unchanged
+        reconciled_version = coordinator.macros_version
         _LOGGER.debug("=== SWITCH: Entity update triggered ===")
         entity_registry = er.async_get(hass)
         current_macro_ids = {macro.get("id") for macro in coordinator.data.get("macros", []) if macro.get("id")}
@@ -58,6 +63,7 @@ async def async_setup_entry(
                     _LOGGER.info("RENAME: Macro renamed: '%s' → '%s' (id: %s)", 
                                 entity._macro_name, macro_name, macro_id)
                     entity._macro_name = macro_name
+                    entity._async_subscribe_data_keys()
                     # Update friendly name in entity registry
                     entity_reg = er.async_get(hass)
                     if entity_entry := entity_reg.async_get(entity.entity_id):
@@ -112,11 +118,11 @@ async def async_setup_entry(
             else:
                 _LOGGER.warning("Could not find entity for macro_id: %s", macro_id)
     
-    # Setup dynamic entity management
-    entry.async_on_unload(coordinator.async_add_listener(_async_update_entities))
+    # Setup dynamic entity management (macro list updates only)
+    entry.async_on_unload(coordinator.async_add_key_listener("macros", _async_update_entities))
 
 
-class HaptiqueRS90SwitchBase(CoordinatorEntity, SwitchEntity):
+class HaptiqueRS90SwitchBase(HaptiqueRS90Entity, SwitchEntity):
     """Base class for Haptique RS90 switches."""
 
     def __init__(
@@ -171,6 +177,11 @@ class HaptiqueRS90MacroSwitch(HaptiqueRS90SwitchBase):
     def name(self) -> str:
         """Return the friendly name (updates on rename)."""
         return self._macro_name
+
+    @property
+    def data_keys(self) -> tuple[DataKey, ...]:
+        """Return the coordinator data keys this switch reads."""
+        return ("status", ("macro_states", self._macro_name))
     
     @property
     def is_on(self) -> bool:
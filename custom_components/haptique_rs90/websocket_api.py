@@ -0,0 +1,91 @@
+"""Websocket API for Haptique RS90 Remote integration.
+
+Serves the command catalog from the coordinator's memory, so dashboards do
+not have to read (and the recorder store) one attribute per command.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_WEBSOCKET_REGISTERED, DOMAIN, WS_CATALOG_LOAD_TIMEOUT, WS_TYPE_CATALOG
+
+ATTR_RS90_ID = "rs90_id"
+ATTR_ETAG = "etag"
+ATTR_DEVICE_IDS = "rs90_device_ids"
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the websocket commands of the integration, once per run."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if domain_data.get(DATA_WEBSOCKET_REGISTERED):
+        return
+    websocket_api.async_register_command(hass, websocket_catalog)
+    domain_data[DATA_WEBSOCKET_REGISTERED] = True
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_CATALOG,
+        vol.Required(ATTR_RS90_ID): str,
+        vol.Optional(ATTR_ETAG): str,
+        vol.Optional(ATTR_DEVICE_IDS): [str],
+    }
+)
+@websocket_api.async_response
+async def websocket_catalog(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return the devices, command IDs and macros of a remote.
+
+    The devices of rs90_device_ids get their commands loaded first when
+    the lazy catalog is enabled, for at most WS_CATALOG_LOAD_TIMEOUT: a
+    device still loading (or an offline remote) is answered with
+    commands None. If the client's etag is still current, only
+    {"etag", "changed": False} is sent back.
+    """
+    from . import async_get_coordinator
+
+    coordinator = async_get_coordinator(hass, msg[ATTR_RS90_ID])
+    if coordinator is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, f"RS90 not found: {msg[ATTR_RS90_ID]}"
+        )
+        return
+
+    device_names = [
+        device_name
+        for rs90_device_id in msg.get(ATTR_DEVICE_IDS, [])
+        if (device_name := coordinator.get_device_name(rs90_device_id))
+    ]
+    fetches = [
+        task
+        for device_name in device_names
+        if (task := coordinator.async_want_device(device_name)) is not None
+    ]
+    if fetches:
+        # Not cancelled on timeout: the commands keep loading for the next request
+        await asyncio.wait(fetches, timeout=WS_CATALOG_LOAD_TIMEOUT)
+
+    etag = coordinator.catalog_etag
+    if msg.get(ATTR_ETAG) == etag:
+        connection.send_result(msg["id"], {"etag": etag, "changed": False})
+        return
+
+    connection.send_result(
+        msg["id"],
+        {
+            "etag": etag,
+            "changed": True,
+            "remote_id": coordinator.remote_id,
+            **coordinator.get_catalog(),
+        },
+    )
@@ -0,0 +1,71 @@
+"""Unit tests for Haptique RS90 battery refresh scheduling."""
+import pytest
+
+from custom_components.haptique_rs90.battery import (
+    BatteryEstimator,
+    battery_refresh_interval,
+    battery_refresh_offset,
+)
+from custom_components.haptique_rs90.const import (
+    BATTERY_REFRESH_INTERVAL,
+    BATTERY_REFRESH_MIN_INTERVAL,
+    BATTERY_REFRESH_MAX_INTERVAL,
+    BATTERY_REFRESH_CHARGING_INTERVAL,
+    BATTERY_REFRESH_STAGGER,
+    BATTERY_ESTIMATOR_WINDOW,
+)
+
+
+@pytest.mark.unit
+def test_battery_refresh_interval_adapts():
+    """Test the interval follows level, drain rate and charging."""
+    assert battery_refresh_interval(None, None, False) == BATTERY_REFRESH_INTERVAL
+    assert battery_refresh_interval(80, None, True) == BATTERY_REFRESH_CHARGING_INTERVAL
+    assert battery_refresh_interval(15, 0.1, False) == BATTERY_REFRESH_MIN_INTERVAL
+    assert battery_refresh_interval(80, 0.0, False) == BATTERY_REFRESH_MAX_INTERVAL
+    assert battery_refresh_interval(80, 0.5, False) == 7200
+    assert battery_refresh_interval(80, 50.0, False) == BATTERY_REFRESH_MIN_INTERVAL
+
+
+@pytest.mark.unit
+def test_battery_refresh_offset_is_stable_and_spread():
+    """Test remotes get a stable offset within the stagger period."""
+    offsets = {battery_refresh_offset(f"remote_{index}") for index in range(12)}
+
+    assert battery_refresh_offset("remote_1") == battery_refresh_offset("remote_1")
+    assert all(0 <= offset < BATTERY_REFRESH_STAGGER for offset in offsets)
+    assert len(offsets) > 1
+
+
+@pytest.mark.unit
+def test_battery_estimator_fits_drain_rate():
+    """Test the rolling fit, charge reset and persistence round trip."""
+    estimator = BatteryEstimator()
+    for hour, level in enumerate((90, 88, 86, 84)):
+        assert estimator.add_sample(hour * 3600, level)
+
+    assert estimator.drain_rate == pytest.approx(2.0)
+    assert estimator.hours_remaining == pytest.approx(42.0)
+    # Same level right after the last sample is not added
+    assert not estimator.add_sample(3 * 3600 + 10, 84)
+
+    restored = BatteryEstimator.from_dict(estimator.as_dict())
+    assert len(restored) == 4
+    assert restored.drain_rate == pytest.approx(2.0)
+
+    # New batteries start a new discharge window
+    estimator.add_sample(5 * 3600, 100)
+    assert estimator.charging
+    assert len(estimator) == 1
+    assert estimator.hours_remaining is None
+
+
+@pytest.mark.unit
+def test_battery_estimator_window_is_bounded():
+    """Test old samples leave the window and the fit."""
+    estimator = BatteryEstimator()
+    for hour in range(BATTERY_ESTIMATOR_WINDOW + 10):
+        estimator.add_sample(hour * 3600, 100 - hour // 2)
+
+    assert len(estimator) == BATTERY_ESTIMATOR_WINDOW
+    assert estimator.drain_rate == pytest.approx(0.5, abs=0.01)
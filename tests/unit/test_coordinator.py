@@ -1,10 +1,21 @@
 """Unit tests for Haptique RS90 coordinator."""
+import asyncio
+import time
+from datetime import timedelta
+
 import pytest
+import voluptuous as vol
 from unittest.mock import AsyncMock, MagicMock, patch
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    async_capture_events,
+    async_fire_time_changed,
+)
 
-from custom_components.haptique_rs90.coordinator import HaptiqueRS90Coordinator
+from custom_components.haptique_rs90 import SEND_COMMAND_SEQUENCE_SCHEMA
+from custom_components.haptique_rs90.coordinator import HaptiqueRS90Coordinator, TopicRouter
 
 
 @pytest.fixture
@@ -138,3 +149,724 @@ def test_parse_macro_state(hass: HomeAssistant, mock_config_entry, mock_mqtt_cli
     assert coordinator._parse_state("OFF") == "off"
     assert coordinator._parse_state(True) == "on"
     assert coordinator._parse_state(False) == "off"
+
+
+@pytest.fixture
+def remote_config_entry():
+    """Mock config entry with a remote id."""
+    entry = MagicMock()
+    entry.data = {
+        "remote_id": "test_remote",
+        "name": "Test RS90",
+    }
+    entry.options = {}
+    entry.entry_id = "test_entry_id"
+    return entry
+
+
+@pytest.mark.unit
+async def test_key_listener_only_wakes_its_key(hass: HomeAssistant, remote_config_entry):
+    """Test a battery update only wakes battery listeners."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    battery_listener = MagicMock()
+    key_listener = MagicMock()
+    coordinator.async_add_key_listener("battery_level", battery_listener)
+    coordinator.async_add_key_listener("last_key", key_listener)
+
+    coordinator._handle_battery("85")
+
+    assert coordinator.data["battery_level"] == 85
+    battery_listener.assert_called_once()
+    key_listener.assert_not_called()
+
+
+@pytest.mark.unit
+async def test_key_listener_slice_notifies_parent(hass: HomeAssistant, remote_config_entry):
+    """Test a macro slice update wakes slice and parent listeners once."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    movie_listener = MagicMock()
+    other_listener = MagicMock()
+    parent_listener = MagicMock()
+    coordinator.async_add_key_listener(("macro_states", "Movie"), movie_listener)
+    coordinator.async_add_key_listener(("macro_states", "Music"), other_listener)
+    coordinator.async_add_key_listener("macro_states", parent_listener)
+    coordinator.async_add_key_listener(("macro_states", "Movie"), parent_listener)
+
+    coordinator.async_update_keys(("macro_states", "Movie"))
+
+    movie_listener.assert_called_once()
+    other_listener.assert_not_called()
+    parent_listener.assert_called_once()
+
+
+@pytest.mark.unit
+async def test_key_listener_remove(hass: HomeAssistant, remote_config_entry):
+    """Test removing a key listener."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    listener = MagicMock()
+    remove = coordinator.async_add_key_listener("status", listener)
+
+    remove()
+    coordinator._handle_status("online")
+
+    listener.assert_not_called()
+    assert "status" not in coordinator._key_listeners
+
+
+@pytest.mark.unit
+def test_topic_router_routes_by_segment():
+    """Test the router dispatches by segment and replays early payloads."""
+    router = TopicRouter("Haptique/test_remote/device/", "/commands")
+    tv_handler = MagicMock()
+    avr_handler = MagicMock()
+
+    assert router.topic == "Haptique/test_remote/device/+/commands"
+
+    # Retained payload received before the device list
+    router.async_route("Haptique/test_remote/device/AVR/commands", "[]")
+    router.async_add_route("TV", tv_handler)
+    remove_avr = router.async_add_route("AVR", avr_handler)
+    avr_handler.assert_called_once_with("[]")
+
+    router.async_route("Haptique/test_remote/device/TV/commands", '[{"id": "POWER"}]')
+    tv_handler.assert_called_once_with('[{"id": "POWER"}]')
+
+    remove_avr()
+    router.async_route("Haptique/test_remote/device/AVR/commands", "[]")
+    assert avr_handler.call_count == 1
+    assert len(router) == 1
+
+
+@pytest.mark.unit
+def test_topic_router_bounds_unrouted_payloads():
+    """Test the router keeps a bounded number of early payloads."""
+    router = TopicRouter("device/", "/commands", max_unrouted=2)
+
+    router.async_route("device/TV/commands", "tv")
+    router.async_route("device/AVR/commands", "avr")
+    router.async_route("device/Projector/commands", "projector")
+    assert list(router._unrouted) == ["AVR", "Projector"]
+
+    # Without room for early payloads, nothing is kept
+    router = TopicRouter("device/", "/commands", max_unrouted=0)
+    router.async_route("device/TV/commands", "tv")
+    handler = MagicMock()
+    router.async_add_route("TV", handler)
+    handler.assert_not_called()
+
+
+@pytest.mark.unit
+async def test_duplicate_list_payload_skipped(hass: HomeAssistant, remote_config_entry):
+    """Test an identical retained device list is skipped before parsing."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    listener = MagicMock()
+    coordinator.async_add_key_listener("devices", listener)
+    payload = '[{"id": "dev1", "name": "TV"}]'
+
+    with patch.object(coordinator, "_async_request_device_details", AsyncMock()):
+        coordinator._handle_device_list(payload)
+        coordinator._handle_device_list(payload)
+        await hass.async_block_till_done()
+
+    listener.assert_called_once()
+    assert coordinator.get_diagnostics()["duplicate_payloads_skipped"] == 1
+
+    coordinator._handle_device_commands("TV", '[{"id": "POWER"}]')
+    version = coordinator.get_commands_version("TV")
+    coordinator._handle_device_commands("TV", '[{"id": "POWER"}]')
+    assert coordinator.get_diagnostics()["duplicate_payloads_skipped"] == 2
+    assert coordinator.get_commands_version("TV") == version
+
+
+@pytest.mark.unit
+async def test_list_versions_bump_on_structural_change(hass: HomeAssistant, remote_config_entry):
+    """Test list versions (and the list listeners) only move on a real change."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    listener = MagicMock()
+    coordinator.async_add_key_listener("macros", listener)
+
+    coordinator._handle_macro_list('[{"id": "m1", "name": "Watch TV"}]')
+    # Different payload, same normalized list
+    coordinator._handle_macro_list('[{"Id": "m1", "name": "Watch TV"}]')
+    assert coordinator.macros_version == 1
+    listener.assert_called_once()
+
+    coordinator._handle_macro_list('[{"id": "m1", "name": "Movie"}]')
+    assert coordinator.macros_version == 2
+    assert listener.call_count == 2
+    assert coordinator.devices_version == 0
+
+
+@pytest.mark.unit
+async def test_load_cache_hydrates_catalog(hass: HomeAssistant, remote_config_entry, hass_storage):
+    """Test the persisted catalog is loaded before MQTT data arrives."""
+    hass_storage["haptique_rs90.catalog.test_remote"] = {
+        "version": 1,
+        "key": "haptique_rs90.catalog.test_remote",
+        "data": {
+            "devices": [{"id": "dev1", "name": "TV"}],
+            "macros": [{"id": "mac1", "name": "Movie"}],
+            "device_commands": {"TV": [{"id": "POWER", "name": None}]},
+        },
+    }
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+
+    await coordinator.async_load_cache()
+
+    assert coordinator.data["devices"] == [{"id": "dev1", "name": "TV"}]
+    assert coordinator.data["macros"] == [{"id": "mac1", "name": "Movie"}]
+    assert coordinator.data["device_commands"]["TV"] == [{"id": "POWER", "name": None}]
+    assert coordinator.get_device_id("TV") == "dev1"
+    assert coordinator.get_command_ids("TV") == frozenset({"POWER"})
+
+
+@pytest.mark.unit
+async def test_initial_sync_publishes_once(hass: HomeAssistant, remote_config_entry):
+    """Test the retained replay is published as a single update."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    listener = MagicMock()
+    coordinator.async_add_key_listener("devices", listener)
+    coordinator.async_add_key_listener("battery_level", listener)
+    coordinator.async_add_key_listener(("device_commands", "TV"), listener)
+
+    coordinator._async_start_initial_sync()
+    with patch.object(coordinator, "_async_request_device_details", AsyncMock()):
+        coordinator._handle_battery("50")
+        coordinator._handle_device_list('[{"id": "dev1", "name": "TV"}]')
+        await hass.async_block_till_done()
+    listener.assert_not_called()
+    assert coordinator.initial_sync_active
+
+    # Last expected commands topic ends the sync
+    coordinator._handle_device_commands("TV", '[{"id": "POWER"}]')
+
+    assert not coordinator.initial_sync_active
+    listener.assert_called_once()
+    diagnostics = coordinator.get_diagnostics()
+    assert diagnostics["initial_sync_end_reason"] == "all commands received"
+    assert diagnostics["initial_sync_seconds"] is not None
+
+
+@pytest.mark.unit
+async def test_initial_sync_commands_before_device_list(hass: HomeAssistant, remote_config_entry):
+    """Test retained commands received before the device list end the sync once."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    listener = MagicMock()
+    coordinator.async_add_key_listener("devices", listener)
+    coordinator.async_add_key_listener("device_commands", listener)
+
+    coordinator._async_start_initial_sync()
+    with patch.object(coordinator, "_async_request_device_details", AsyncMock()):
+        coordinator.async_dispatch("device/TV/commands", '[{"id": "POWER"}]')
+        coordinator.async_dispatch("device/AVR/commands", '[{"id": "MUTE"}]')
+        coordinator.async_dispatch("device/Projector/commands", '[{"id": "POWER"}]')
+        coordinator._handle_device_list(
+            '[{"id": "dev1", "name": "TV"}, {"id": "dev2", "name": "AVR"}, {"id": "dev3", "name": "Projector"}]'
+        )
+        await hass.async_block_till_done()
+
+    assert not coordinator.initial_sync_active
+    listener.assert_called_once()
+    assert set(coordinator.data["device_commands"]) == {"TV", "AVR", "Projector"}
+    assert coordinator.get_diagnostics()["initial_sync_end_reason"] == "all commands received"
+
+
+@pytest.mark.unit
+async def test_coalescing_loop_merges_updates(hass: HomeAssistant, remote_config_entry):
+    """Test updates made within one loop iteration give one notification."""
+    remote_config_entry.options = {"update_coalescing": "loop"}
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    listener = MagicMock()
+    coordinator.async_add_key_listener("macro_states", listener)
+    coordinator.async_add_key_listener("test_status", listener)
+
+    coordinator._handle_macro_trigger("Movie", "on")
+    coordinator._handle_test_status("Movie running")
+    coordinator._handle_macro_trigger("Music", "off")
+    listener.assert_not_called()
+
+    await asyncio.sleep(0)
+
+    listener.assert_called_once()
+    assert coordinator.get_diagnostics()["coalesced_updates"] == 2
+
+    coordinator._handle_macro_trigger("Movie", "off")
+    await asyncio.sleep(0)
+    assert listener.call_count == 2
+
+
+@pytest.mark.unit
+async def test_coalescing_window_merges_updates(hass: HomeAssistant, remote_config_entry):
+    """Test updates made within the time window give one notification."""
+    remote_config_entry.options = {
+        "update_coalescing": "window",
+        "update_coalescing_window": 100,
+    }
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    battery_listener = MagicMock()
+    macro_listener = MagicMock()
+    coordinator.async_add_key_listener("battery_level", battery_listener)
+    coordinator.async_add_key_listener(("macro_states", "Movie"), macro_listener)
+
+    coordinator._handle_battery("80")
+    await asyncio.sleep(0)
+    coordinator._handle_macro_trigger("Movie", "on")
+    coordinator._handle_battery("79")
+    battery_listener.assert_not_called()
+    macro_listener.assert_not_called()
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+
+    battery_listener.assert_called_once()
+    macro_listener.assert_called_once()
+    assert coordinator.data["battery_level"] == 79
+
+
+@pytest.mark.unit
+async def test_coalescing_fires_key_events_immediately(hass: HomeAssistant, remote_config_entry):
+    """Test key events reach the bus even while notifications are coalesced."""
+    remote_config_entry.options = {"update_coalescing": "window"}
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    events = async_capture_events(hass, "haptique_rs90_key_pressed")
+
+    coordinator._handle_keys("button:7")
+    coordinator._handle_keys("button:7")
+    await hass.async_block_till_done()
+
+    assert [event.data["button"] for event in events] == [7, 7]
+
+
+@pytest.mark.unit
+async def test_key_fast_path(hass: HomeAssistant, remote_config_entry):
+    """Test a key press only wakes last_key listeners, without coalescing delay."""
+    remote_config_entry.options = {"update_coalescing": "window"}
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    key_listener = MagicMock()
+    battery_listener = MagicMock()
+    coordinator.async_add_key_listener("last_key", key_listener)
+    coordinator.async_add_key_listener("battery_level", battery_listener)
+
+    coordinator._handle_keys("button:3", time.perf_counter())
+
+    key_listener.assert_called_once()
+    battery_listener.assert_not_called()
+    assert coordinator.data["last_key"] == "3"
+    latency = coordinator.get_diagnostics()["key_event_latency"]
+    assert latency["count"] == 1
+    assert latency["last_ms"] is not None
+
+
+@pytest.mark.unit
+async def test_keymap_publishes_mapped_action(hass: HomeAssistant, remote_config_entry):
+    """Test a mapped button publishes its device command directly."""
+    remote_config_entry.options = {"keymap": "7 = device:dev1:volume_up"}
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    coordinator.data["devices"] = [{"id": "dev1", "name": "AVR"}]
+    coordinator._rebuild_device_index()
+    coordinator._async_compile_keymap()
+
+    with patch(
+        "custom_components.haptique_rs90.coordinator.mqtt.async_publish", AsyncMock()
+    ) as mock_publish:
+        coordinator._handle_keys("button:7")
+        coordinator._handle_keys("button:8")
+        await hass.async_block_till_done()
+
+    mock_publish.assert_called_once_with(
+        hass, "Haptique/test_remote/device/AVR/trigger", "volume_up", qos=1, retain=False
+    )
+
+
+@pytest.mark.unit
+async def test_catalog_indexes(hass: HomeAssistant, remote_config_entry):
+    """Test id/name indexes follow the device, macro and command payloads."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+
+    with patch.object(coordinator, "_async_request_device_details", AsyncMock()):
+        coordinator._handle_device_list('[{"Id": "dev1", "name": "TV"}]')
+        await hass.async_block_till_done()
+    coordinator._handle_macro_list('[{"id": "mac1", "name": "Movie"}]')
+    coordinator._handle_device_commands("TV", '[{"ID": "POWER"}, {"id": "MUTE"}]')
+
+    assert coordinator.get_device_name("dev1") == "TV"
+    assert coordinator.get_device_id("TV") == "dev1"
+    assert coordinator.get_macro_name("mac1") == "Movie"
+    assert coordinator.get_macro_id("Movie") == "mac1"
+    assert coordinator.get_command_ids("TV") == frozenset({"POWER", "MUTE"})
+
+    coordinator._handle_device_list("[]")
+    assert coordinator.get_device_name("dev1") is None
+    assert coordinator.get_command_ids("TV") == frozenset()
+
+
+@pytest.mark.unit
+async def test_command_queue_paces_per_device(hass: HomeAssistant, remote_config_entry):
+    """Test commands are serialized per device and run in parallel across devices."""
+    remote_config_entry.options = {"command_gap": 0}
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    published = []
+
+    async def _publish(hass, topic, payload, qos, retain):
+        published.append((topic, payload))
+        await asyncio.sleep(0)
+
+    with patch("custom_components.haptique_rs90.coordinator.mqtt.async_publish", _publish):
+        await asyncio.gather(
+            coordinator.async_trigger_device_command("TV", "1"),
+            coordinator.async_trigger_device_command("TV", "2"),
+            coordinator.async_trigger_device_command("AVR", "volume_up"),
+            coordinator.async_trigger_device_command("TV", "OK"),
+        )
+
+    tv_commands = [payload for topic, payload in published if "/TV/" in topic]
+    assert tv_commands == ["1", "2", "OK"]
+    # AVR does not wait behind the TV queue
+    assert published.index(("Haptique/test_remote/device/AVR/trigger", "volume_up")) < 3
+    stats = coordinator.get_diagnostics()["command_queue"]["devices"]
+    assert stats["TV"]["sent"] == 3
+    assert stats["TV"]["depth"] == 0
+    assert stats["AVR"]["dropped"] == 0
+
+
+@pytest.mark.unit
+async def test_command_queue_shutdown_cancels_in_flight(hass: HomeAssistant, remote_config_entry):
+    """Test shutdown releases the caller of the command being published."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    publishing = asyncio.Event()
+
+    async def _publish(hass, topic, payload, qos, retain):
+        publishing.set()
+        await asyncio.Event().wait()  # Never answered
+
+    with patch("custom_components.haptique_rs90.coordinator.mqtt.async_publish", _publish):
+        in_flight = asyncio.ensure_future(coordinator.async_trigger_device_command("TV", "1"))
+        queued = asyncio.ensure_future(coordinator.async_trigger_device_command("TV", "2"))
+        await publishing.wait()
+        await coordinator._command_queue.async_shutdown()
+        results = await asyncio.wait_for(
+            asyncio.gather(in_flight, queued, return_exceptions=True), 1
+        )
+
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+
+
+@pytest.mark.unit
+async def test_send_command_sequence(hass: HomeAssistant, remote_config_entry):
+    """Test a command sequence is sent in order with per-command timing."""
+    remote_config_entry.options = {"command_gap": 0}
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+
+    with patch(
+        "custom_components.haptique_rs90.coordinator.mqtt.async_publish", AsyncMock()
+    ) as mock_publish:
+        result = await coordinator.async_send_command_sequence(
+            "TV", [("1", 0.0), ("2", 0.0), ("OK", 0.0)]
+        )
+
+    assert [call.args[2] for call in mock_publish.call_args_list] == ["1", "2", "OK"]
+    assert result["sent"] == 3
+    assert [command["command"] for command in result["commands"]] == ["1", "2", "OK"]
+    assert "queue_wait_ms" in result["commands"][0]
+
+
+@pytest.mark.unit
+async def test_battery_refresh_skipped_while_offline(hass: HomeAssistant, remote_config_entry):
+    """Test the battery request is skipped offline and caught up once online."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+
+    with patch(
+        "custom_components.haptique_rs90.coordinator.mqtt.async_publish", AsyncMock()
+    ) as mock_publish:
+        coordinator._async_battery_refresh()
+        await hass.async_block_till_done()
+        mock_publish.assert_not_called()
+        assert coordinator.get_diagnostics()["battery_refresh"]["skipped_offline"] == 1
+
+        coordinator._handle_status("online")
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=61))
+        await hass.async_block_till_done()
+
+    mock_publish.assert_called_once_with(
+        hass, "Haptique/test_remote/battery/status", "", qos=0, retain=False
+    )
+    assert coordinator.get_diagnostics()["battery_refresh"]["next_refresh"] is not None
+    await coordinator.async_shutdown()
+
+
+@pytest.mark.unit
+async def test_device_rename_migrates_route_and_commands(hass: HomeAssistant, remote_config_entry):
+    """Test a rename moves the route and commands without a details request."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+
+    with patch.object(coordinator, "_async_request_device_details", AsyncMock()) as request:
+        coordinator._handle_device_list('[{"id": "dev1", "name": "TV"}, {"id": "dev2", "name": "AVR"}]')
+        coordinator._handle_device_commands("TV", '[{"id": "POWER"}]')
+        version = coordinator.get_commands_version("TV")
+        coordinator._handle_device_list('[{"id": "dev1", "name": "Living TV"}]')
+        await hass.async_block_till_done()
+
+    # No details request under the new name
+    assert all(call.args != ("Living TV",) for call in request.call_args_list)
+    assert coordinator.data["device_commands"] == {"Living TV": [{"id": "POWER", "name": None}]}
+    assert coordinator.get_command_ids("Living TV") == frozenset({"POWER"})
+    assert coordinator.get_commands_version("Living TV") == version
+    subscriptions = coordinator.get_diagnostics()["subscriptions"]
+    assert subscriptions["devices"] == 1
+    assert subscriptions["renames_migrated"] == 1
+    assert "TV" not in coordinator.get_diagnostics()["detail_fetch"]["devices"]
+    assert len(coordinator._command_router) == 1
+
+    # The new name is routed, the old one is released
+    coordinator.async_dispatch("device/Living TV/commands", '[{"id": "MUTE"}]')
+    coordinator.async_dispatch("device/TV/commands", '[{"id": "OLD"}]')
+    assert coordinator.get_command_ids("Living TV") == frozenset({"MUTE"})
+    assert "TV" not in coordinator.data["device_commands"]
+
+
+@pytest.mark.unit
+async def test_device_rename_keeps_commands_received_first(hass: HomeAssistant, remote_config_entry):
+    """Test a rename does not overwrite commands already received under the new name."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+
+    with patch.object(coordinator, "_async_request_device_details", AsyncMock()):
+        coordinator._handle_device_list('[{"id": "dev1", "name": "TV"}]')
+        coordinator._handle_device_commands("TV", '[{"id": "OLD"}]')
+        # Retained payload of the new name before the renamed list
+        coordinator.async_dispatch("device/Living TV/commands", '[{"id": "NEW"}]')
+        coordinator._handle_device_list('[{"id": "dev1", "name": "Living TV"}]')
+        await hass.async_block_till_done()
+
+    assert coordinator.data["device_commands"] == {"Living TV": [{"id": "NEW", "name": None}]}
+    assert coordinator.get_command_ids("Living TV") == frozenset({"NEW"})
+    assert "TV" not in coordinator.get_diagnostics()["detail_fetch"]["devices"]
+
+    # The kept fingerprint is the new payload's: a repeat is still a duplicate
+    listener = MagicMock()
+    coordinator.async_add_key_listener(("device_commands", "Living TV"), listener)
+    coordinator.async_dispatch("device/Living TV/commands", '[{"id": "NEW"}]')
+    listener.assert_not_called()
+
+
+@pytest.mark.unit
+async def test_detail_fetch_bounded_with_retries(hass: HomeAssistant, remote_config_entry):
+    """Test detail requests respect the limit and retry when unanswered."""
+    remote_config_entry.options = {"detail_concurrency": 2}
+    # Short deadline and backoff, so the retries complete in a few loop turns
+    with patch(
+        "custom_components.haptique_rs90.coordinator.DETAIL_REQUEST_TIMEOUT", 0.05
+    ), patch("custom_components.haptique_rs90.coordinator.DETAIL_RETRY_BACKOFF", 0.01):
+        coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    requested = []
+
+    async def _request(device_name):
+        requested.append(device_name)
+
+    with patch.object(coordinator, "_async_request_device_details", _request):
+        tv, avr, projector = (
+            coordinator._detail_fetcher.async_fetch(device_name)
+            for device_name in ("TV", "AVR", "Projector")
+        )
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        # Only two requests are outstanding at a time
+        assert coordinator.get_diagnostics()["detail_fetch"]["in_flight"] == 2
+        assert requested == ["TV", "AVR"]
+        coordinator._handle_device_commands("TV", '[{"id": "POWER"}]')
+        coordinator._handle_device_commands("AVR", '[{"id": "MUTE"}]')
+        assert await asyncio.wait_for(asyncio.gather(tv, avr), 1) == [True, True]
+
+        # Projector never answers: retried after each deadline, then failed
+        assert await asyncio.wait_for(projector, 5) is False
+
+    assert requested == ["TV", "AVR", "Projector", "Projector", "Projector"]
+    stats = coordinator.get_diagnostics()["detail_fetch"]
+    assert stats["devices"]["Projector"]["state"] == "failed"
+    assert stats["timeouts"] == 3
+    await coordinator.async_shutdown()
+    assert coordinator.get_diagnostics()["detail_fetch"]["running"] == 0
+
+
+@pytest.mark.unit
+async def test_detail_fetch_waits_for_online(hass: HomeAssistant, remote_config_entry):
+    """Test detail requests pause while offline and failed ones retry when back."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    requested = []
+
+    async def _request(device_name):
+        requested.append(device_name)
+
+    with patch.object(coordinator, "_async_request_device_details", _request):
+        coordinator._handle_status("online")
+        coordinator._handle_status("offline")
+        task = coordinator._detail_fetcher.async_fetch("TV")
+        await asyncio.sleep(0)
+        assert requested == []
+        assert coordinator.get_diagnostics()["detail_fetch"]["devices"]["TV"]["state"] == "pending"
+
+        coordinator._handle_status("online")
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        coordinator._handle_device_commands("TV", '[{"id": "POWER"}]')
+        assert await asyncio.wait_for(task, 1) is True
+
+    assert requested == ["TV"]
+    state = coordinator.get_diagnostics()["detail_fetch"]["devices"]["TV"]
+    assert state["state"] == "ok"
+    assert state["attempts"] == 1
+    assert state["rtt_ms"] is not None
+
+
+@pytest.mark.unit
+async def test_detail_fetch_paused_by_retained_offline(hass: HomeAssistant, remote_config_entry):
+    """Test a retained offline status at startup pauses detail requests."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    requested = []
+
+    async def _request(device_name):
+        requested.append(device_name)
+
+    with patch.object(coordinator, "_async_request_device_details", _request):
+        # Same as the initial status: no change, but the fetcher must pause
+        coordinator._handle_status("offline")
+        task = coordinator._detail_fetcher.async_fetch("TV")
+        await asyncio.sleep(0)
+        assert requested == []
+        assert coordinator.get_diagnostics()["detail_fetch"]["paused_offline"] is True
+
+        coordinator._handle_status("online")
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        coordinator._handle_device_commands("TV", '[{"id": "POWER"}]')
+        assert await asyncio.wait_for(task, 1) is True
+
+    assert requested == ["TV"]
+    assert coordinator.get_diagnostics()["detail_fetch"]["devices"]["TV"]["state"] == "ok"
+
+
+@pytest.mark.unit
+async def test_lazy_catalog_fetches_on_first_use(hass: HomeAssistant, remote_config_entry):
+    """Test lazy mode only fetches prefetched devices until one is used."""
+    remote_config_entry.options = {"lazy_catalog": True, "prefetch_devices": "TV"}
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+
+    with patch.object(coordinator, "_async_request_device_details", AsyncMock()) as request:
+        coordinator.async_dispatch("device/AVR/commands", '[{"id": "MUTE"}]')
+        coordinator._handle_device_list(
+            '[{"id": "dev1", "name": "TV"}, {"id": "dev2", "name": "AVR"}, {"id": "dev3", "name": "Projector"}]'
+        )
+        await hass.async_block_till_done()
+        assert [call.args for call in request.call_args_list] == [("TV",)]
+        assert coordinator.get_diagnostics()["subscribed_devices"] == ["TV"]
+
+        # The retained AVR payload nobody asked for was not kept
+        assert coordinator._command_router._unrouted == {}
+        assert coordinator.get_command_ids("AVR") == frozenset()
+
+        # Projector is requested on first use
+        task = coordinator.async_want_device("Projector")
+        assert task is not None
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        coordinator._handle_device_commands("Projector", '[{"id": "POWER"}]')
+        await hass.async_block_till_done()
+        assert await coordinator.async_ensure_device_commands("Projector") == [
+            {"id": "POWER", "name": None}
+        ]
+        assert coordinator.async_want_device("Unknown") is None
+
+    assert [call.args for call in request.call_args_list] == [("TV",), ("Projector",)]
+    await coordinator.async_shutdown()
+
+
+@pytest.mark.unit
+async def test_catalog_etag_tracks_changes(hass: HomeAssistant, remote_config_entry):
+    """Test the catalog lists command IDs and its etag only moves on changes."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+
+    with patch.object(coordinator, "_async_request_device_details", AsyncMock()):
+        coordinator._handle_device_list('[{"id": "dev1", "name": "TV"}, {"id": "dev2", "name": "AVR"}]')
+        coordinator._handle_macro_list('[{"id": "m1", "name": "Watch TV"}]')
+        coordinator._handle_device_commands("TV", '[{"id": "POWER"}, {"id": "MUTE"}]')
+        await hass.async_block_till_done()
+
+    assert coordinator.get_catalog() == {
+        "devices": [
+            {"id": "dev1", "name": "TV", "commands": ["POWER", "MUTE"]},
+            {"id": "dev2", "name": "AVR", "commands": None},
+        ],
+        "macros": [{"id": "m1", "name": "Watch TV"}],
+    }
+    etag = coordinator.catalog_etag
+    coordinator._handle_device_commands("TV", '[{"id": "POWER"}, {"id": "MUTE"}]')
+    assert coordinator.catalog_etag == etag
+    coordinator._handle_device_commands("TV", '[{"id": "POWER"}]')
+    assert coordinator.catalog_etag != etag
+
+
+@pytest.mark.unit
+async def test_recorder_friendly_rate_limits_last_key(hass: HomeAssistant, remote_config_entry):
+    """Test last key notifications are rate limited while events stay lossless."""
+    remote_config_entry.options = {"recorder_friendly": True}
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    events = async_capture_events(hass, "haptique_rs90_key_pressed")
+    listener = MagicMock()
+    coordinator.async_add_key_listener("last_key", listener)
+
+    for payload in ("button:1", "button:2", "button:9"):
+        coordinator._handle_keys(payload)
+    await hass.async_block_till_done()
+
+    assert [event.data["button"] for event in events] == [1, 2, 9]
+    listener.assert_called_once()
+
+    # One trailing notification carries the latest key
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2))
+    await hass.async_block_till_done()
+    assert listener.call_count == 2
+    assert coordinator.data["last_key"] == "9"
+    assert coordinator.get_diagnostics()["recorder_friendly"]["last_key_writes_suppressed"] == 1
+    await coordinator.async_shutdown()
+
+
+@pytest.mark.unit
+async def test_active_macros_track_start_order(hass: HomeAssistant, remote_config_entry):
+    """Test the active macros keep their start order and first start time."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    coordinator._handle_macro_list('[{"id": "m1", "name": "Watch TV"}, {"id": "m2", "name": "Music"}]')
+
+    coordinator._handle_macro_trigger("Watch TV", "on")
+    started = coordinator.active_macros["Watch TV"]
+    with patch("custom_components.haptique_rs90.coordinator.mqtt.async_publish", AsyncMock()):
+        await coordinator.async_trigger_macro("Music", "on")
+    coordinator._handle_macro_trigger("Watch TV", "ON")  # Echo keeps the start time
+    assert list(coordinator.active_macros) == ["Watch TV", "Music"]
+    assert coordinator.active_macros["Watch TV"] == started
+    assert coordinator.last_started_macro == "Music"
+
+    coordinator._handle_macro_trigger("Music", "off")
+    assert coordinator.last_started_macro == "Watch TV"
+
+    # A rename moves the entry, a removal drops it
+    coordinator._handle_macro_list('[{"id": "m1", "name": "Cinema"}, {"id": "m2", "name": "Music"}]')
+    assert coordinator.active_macros == {"Cinema": started}
+    coordinator._handle_macro_list('[{"id": "m2", "name": "Music"}]')
+    assert coordinator.last_started_macro is None
+
+
+@pytest.mark.unit
+def test_send_command_sequence_schema():
+    """Test the sequence service coerces its input and rejects bad values."""
+    data = SEND_COMMAND_SEQUENCE_SCHEMA(
+        {"rs90_id": "abc", "rs90_device_id": "dev1", "commands": "1, 2, OK", "delays": ["0", 500], "repeat": "2"}
+    )
+    assert data["commands"] == ["1", "2", "OK"]
+    assert data["delays"] == [0.0, 500.0]
+    assert data["repeat"] == 2
+
+    for bad in ({"repeat": "x"}, {"repeat": 0}, {"delays": ["soon"]}, {"commands": []}):
+        with pytest.raises(vol.Invalid):
+            SEND_COMMAND_SEQUENCE_SCHEMA(
+                {"rs90_id": "abc", "rs90_device_id": "dev1", "commands": ["OK"], **bad}
+            )
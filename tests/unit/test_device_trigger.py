@@ -0,0 +1,59 @@
+"""Unit tests for Haptique RS90 device triggers."""
+import pytest
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from custom_components.haptique_rs90.const import DOMAIN, SIGNAL_BUTTON_PRESSED
+from custom_components.haptique_rs90.device_trigger import (
+    TRIGGER_BUTTON_PRESSED,
+    async_attach_trigger,
+)
+
+
+def _press(hass: HomeAssistant, device_id: str, button: int) -> None:
+    """Send the per-button signal the coordinator sends for a key press."""
+    async_dispatcher_send(
+        hass,
+        SIGNAL_BUTTON_PRESSED.format(device_id=device_id, button=button),
+        {"remote_id": "test_remote", "device_id": device_id, "button": button, "timestamp": 0.0},
+    )
+
+
+@pytest.mark.unit
+async def test_device_trigger_fires_for_its_button_only(hass: HomeAssistant):
+    """Test a trigger only runs for its own device and button."""
+    calls = []
+
+    @callback
+    def action(variables, context=None):
+        calls.append(variables)
+
+    unsubscribe = await async_attach_trigger(
+        hass,
+        {
+            "platform": "device",
+            "domain": DOMAIN,
+            "device_id": "device_1",
+            "type": TRIGGER_BUTTON_PRESSED,
+            "button": 3,
+        },
+        action,
+        {"trigger_data": {"id": "0", "idx": "0", "alias": None}},
+    )
+
+    _press(hass, "device_1", 4)
+    _press(hass, "device_2", 3)
+    _press(hass, "device_1", 3)
+    await hass.async_block_till_done()
+
+    assert len(calls) == 1
+    trigger = calls[0]["trigger"]
+    assert trigger["platform"] == "device"
+    assert trigger["id"] == "0"
+    assert trigger["event"].data["button"] == 3
+    assert trigger["event"].data["device_id"] == "device_1"
+
+    unsubscribe()
+    _press(hass, "device_1", 3)
+    await hass.async_block_till_done()
+    assert len(calls) == 1
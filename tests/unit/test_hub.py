@@ -0,0 +1,112 @@
+"""Unit tests for Haptique RS90 shared MQTT hub."""
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+
+from custom_components.haptique_rs90.const import DATA_HUB, DOMAIN
+from custom_components.haptique_rs90.hub import async_get_hub
+
+
+def _message(topic: str, payload: str) -> MagicMock:
+    """Return a fake MQTT message."""
+    msg = MagicMock()
+    msg.topic = topic
+    msg.payload = payload
+    return msg
+
+
+def _coordinator(remote_id: str) -> MagicMock:
+    """Return a fake coordinator for a remote."""
+    coordinator = MagicMock()
+    coordinator.remote_id = remote_id
+    return coordinator
+
+
+@pytest.mark.unit
+async def test_hub_subscribes_once_and_routes_by_remote(hass: HomeAssistant):
+    """Test one subscription serves every remote, routed by remote id."""
+    hub = async_get_hub(hass)
+    assert hass.data[DOMAIN][DATA_HUB] is hub
+    living_room = _coordinator("living_room")
+    bedroom = _coordinator("bedroom")
+
+    with patch(
+        "custom_components.haptique_rs90.hub.mqtt.async_subscribe", AsyncMock()
+    ) as subscribe:
+        await hub.async_register(living_room)
+        await hub.async_register(bedroom)
+
+    subscribe.assert_called_once()
+    assert subscribe.call_args[0][1] == "Haptique/#"
+    message_received = subscribe.call_args[0][2]
+
+    message_received(_message("Haptique/bedroom/device/TV/commands", "[]"))
+    message_received(_message("Haptique/kitchen/status", "online"))
+
+    living_room.async_dispatch.assert_not_called()
+    assert bedroom.async_dispatch.call_args[0][:2] == ("device/TV/commands", "[]")
+    assert hub.get_diagnostics()["unconfigured_remotes"] == {"kitchen": 1}
+
+
+@pytest.mark.unit
+async def test_hub_replays_state_on_late_register(hass: HomeAssistant):
+    """Test a remote registered after the subscription gets the cached state."""
+    hub = async_get_hub(hass)
+    first = _coordinator("living_room")
+
+    with patch(
+        "custom_components.haptique_rs90.hub.mqtt.async_subscribe", AsyncMock()
+    ) as subscribe:
+        await hub.async_register(first)
+        message_received = subscribe.call_args[0][2]
+        message_received(_message("Haptique/bedroom/status", "online"))
+        message_received(_message("Haptique/bedroom/keys", '{"button": 3}'))
+        message_received(_message("Haptique/bedroom/device/TV/commands", "[]"))
+
+        late = _coordinator("bedroom")
+        await hub.async_register(late)
+
+    # State topics are replayed, key presses and device commands are not
+    late.async_dispatch.assert_called_once_with("status", "online")
+    assert hub.get_cached_status("bedroom") == "online"
+    assert hub.get_status_remote_ids() == {"bedroom"}
+    assert "bedroom" not in hub.unconfigured_remotes
+
+
+@pytest.mark.unit
+async def test_hub_concurrent_register_subscribes_once(hass: HomeAssistant):
+    """Test remotes registering at the same time share a single subscription."""
+    hub = async_get_hub(hass)
+
+    async def _slow_subscribe(*args, **kwargs):
+        await asyncio.sleep(0)
+        return MagicMock()
+
+    with patch(
+        "custom_components.haptique_rs90.hub.mqtt.async_subscribe", side_effect=_slow_subscribe
+    ) as subscribe:
+        await asyncio.gather(
+            hub.async_register(_coordinator("living_room")),
+            hub.async_register(_coordinator("bedroom")),
+        )
+
+    subscribe.assert_called_once()
+    assert hub.get_diagnostics()["registered_remotes"] == ["living_room", "bedroom"]
+
+
+@pytest.mark.unit
+async def test_hub_subscribe_failure_not_ready(hass: HomeAssistant):
+    """Test a failed subscription raises ConfigEntryNotReady and unregisters."""
+    hub = async_get_hub(hass)
+
+    with patch(
+        "custom_components.haptique_rs90.hub.mqtt.async_subscribe",
+        AsyncMock(side_effect=HomeAssistantError("not connected")),
+    ), pytest.raises(ConfigEntryNotReady):
+        await hub.async_register(_coordinator("living_room"))
+
+    assert hub.get_diagnostics()["registered_remotes"] == []
+    assert hub.get_diagnostics()["subscribed"] is False
@@ -0,0 +1,43 @@
+"""Unit tests for Haptique RS90 local keymap."""
+import pytest
+
+from custom_components.haptique_rs90.keymap import KeymapError, parse_keymap
+
+
+@pytest.mark.unit
+def test_parse_keymap():
+    """Test parsing device and macro mappings."""
+    keymap = parse_keymap(
+        """
+        # Living room
+        7 = device:AVR:volume_up
+        12 = macro:Watch TV
+        13 = macro:692eb1561bddd5814022960c:OFF
+        """
+    )
+
+    assert keymap == {
+        7: ("device", "AVR", "volume_up"),
+        12: ("macro", "Watch TV", "on"),
+        13: ("macro", "692eb1561bddd5814022960c", "off"),
+    }
+    assert parse_keymap(None) == {}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "text",
+    [
+        "7 device:AVR:volume_up",
+        "x = device:AVR:volume_up",
+        "25 = device:AVR:volume_up",
+        "7 = device:AVR",
+        "7 = macro:Watch TV:toggle",
+        "7 = light:kitchen",
+        "7 = device:AVR:volume_up\n7 = device:AVR:volume_down",
+    ],
+)
+def test_parse_keymap_invalid(text):
+    """Test invalid keymap lines are rejected."""
+    with pytest.raises(KeymapError):
+        parse_keymap(text)
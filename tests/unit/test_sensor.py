@@ -0,0 +1,78 @@
+"""Unit tests for Haptique RS90 sensors."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from homeassistant.core import HomeAssistant
+
+from custom_components.haptique_rs90.coordinator import HaptiqueRS90Coordinator
+from custom_components.haptique_rs90.sensor import (
+    HaptiqueRS90DeviceCommandsSensor,
+    RS90InfoSummarySensor,
+)
+
+
+@pytest.fixture
+def remote_config_entry():
+    """Mock config entry with a remote id."""
+    entry = MagicMock()
+    entry.data = {
+        "remote_id": "test_remote",
+        "name": "Test RS90",
+    }
+    entry.options = {}
+    entry.entry_id = "test_entry_id"
+    return entry
+
+
+@pytest.mark.unit
+async def test_device_commands_sensor_skips_unchanged_writes(
+    hass: HomeAssistant, remote_config_entry
+):
+    """Test the commands sensor only writes its state when the commands changed."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    with patch.object(coordinator, "_async_request_device_details", AsyncMock()):
+        coordinator._handle_device_list('[{"id": "dev1", "name": "TV"}]')
+        coordinator._handle_device_commands("TV", '[{"id": "POWER"}]')
+        await hass.async_block_till_done()
+
+    sensor = HaptiqueRS90DeviceCommandsSensor(coordinator, remote_config_entry, "TV")
+    sensor._async_subscribe_data_keys()
+    with patch.object(sensor, "async_write_ha_state") as write:
+        coordinator.async_update_keys(("device_commands", "TV"))
+        assert write.call_count == 1
+
+        # Same commands notified again: nothing to write
+        coordinator.async_update_keys(("device_commands", "TV"))
+        assert write.call_count == 1
+
+        coordinator._handle_device_commands("TV", '[{"id": "POWER"}, {"id": "MUTE"}]')
+        assert write.call_count == 2
+
+    assert sensor.extra_state_attributes["commands"] == ["POWER", "MUTE"]
+    await coordinator.async_shutdown()
+
+
+@pytest.mark.unit
+async def test_info_summary_sensor_skips_unchanged_writes(
+    hass: HomeAssistant, remote_config_entry
+):
+    """Test the summary sensor only writes its state when a list changed."""
+    coordinator = HaptiqueRS90Coordinator(hass, remote_config_entry)
+    sensor = RS90InfoSummarySensor(coordinator, remote_config_entry)
+    sensor._async_subscribe_data_keys()
+
+    with patch.object(coordinator, "_async_request_device_details", AsyncMock()), patch.object(
+        sensor, "async_write_ha_state"
+    ) as write:
+        coordinator._handle_macro_list('[{"id": "m1", "name": "Watch TV"}]')
+        assert write.call_count == 1
+
+        # Notified without a list change: nothing to write
+        coordinator.async_update_keys("devices", "macros")
+        assert write.call_count == 1
+
+        coordinator._handle_device_list('[{"id": "dev1", "name": "TV"}]')
+        assert write.call_count == 2
+        await hass.async_block_till_done()
+
+    assert sensor.native_value == "1 devices, 1 macros"
+    await coordinator.async_shutdown()
@@ -0,0 +1,46 @@
+"""Unit tests for Haptique RS90 websocket API."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from homeassistant.core import HomeAssistant
+
+from custom_components.haptique_rs90.coordinator import HaptiqueRS90Coordinator
+from custom_components.haptique_rs90.websocket_api import (
+    async_register_websocket_commands,
+    websocket_catalog,
+)
+
+
+@pytest.mark.unit
+async def test_websocket_commands_registered_once(hass: HomeAssistant):
+    """Test setting up or reloading entries registers the commands once."""
+    with patch(
+        "custom_components.haptique_rs90.websocket_api.websocket_api.async_register_command"
+    ) as register:
+        async_register_websocket_commands(hass)
+        async_register_websocket_commands(hass)
+
+    register.assert_called_once_with(hass, websocket_catalog)
+
+
+@pytest.mark.unit
+async def test_websocket_catalog_answers_while_offline(hass: HomeAssistant):
+    """Test the catalog answers in bounded time when commands cannot load."""
+    entry = MagicMock()
+    entry.data = {"remote_id": "test_remote", "name": "Test RS90"}
+    entry.options = {"lazy_catalog": True}
+    entry.entry_id = "test_entry_id"
+    coordinator = HaptiqueRS90Coordinator(hass, entry)
+    connection = MagicMock()
+
+    with patch.object(coordinator, "_async_request_device_details", AsyncMock()), patch(
+        "custom_components.haptique_rs90.async_get_coordinator", return_value=coordinator
+    ), patch("custom_components.haptique_rs90.websocket_api.WS_CATALOG_LOAD_TIMEOUT", 0.05):
+        coordinator._handle_status("offline")
+        coordinator._handle_device_list('[{"id": "dev1", "name": "TV"}]')
+        await websocket_catalog.__wrapped__(
+            hass, connection, {"id": 1, "rs90_id": "test_remote", "rs90_device_ids": ["dev1"]}
+        )
+
+    result = connection.send_result.call_args[0][1]
+    assert result["devices"] == [{"id": "dev1", "name": "TV", "commands": None}]
+    await coordinator.async_shutdown()